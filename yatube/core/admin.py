@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'kind', 'target', 'status', 'progress', 'created',
+                    'updated')
+    list_filter = ('status', 'kind')
+    # Задание меняет только его обработчик: параметры из админки
+    # выполнил бы run_jobs.
+    readonly_fields = (
+        'kind', 'target', 'status', 'total', 'done', 'error', 'payload',
+    )
+
+    def progress(self, obj):
+        return f'{obj.done}/{obj.total} ({obj.percent}%)'
+
+    progress.short_description = 'Прогресс'
+
+
+admin.site.register(Job, JobAdmin)
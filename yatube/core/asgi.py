@@ -0,0 +1,167 @@
+"""Запуск Django 2.2 под ASGI-сервером (uvicorn, daphne, hypercorn).
+
+В Django 2.2 нет ASGI-обработчика, поэтому обычные запросы передаются
+WSGI-приложению в пуле потоков, а асинхронные ASGI-приложения (поток
+событий core/events.py) обслуживают свои префиксы пути прямо в цикле
+событий. Ответ WSGI собирается целиком, кроме файлов: FileResponse
+(core/serving.py) уходит через wsgi.file_wrapper. Если сервер
+поддерживает расширение ASGI http.response.zerocopysend, файл
+отправляется системным вызовом sendfile() без копирования в память
+процесса, иначе — блоками, не загружаясь в память целиком. Вне
+отладки большие файлы всё равно лучше отдавать прокси
+(FILE_SERVING_OFFLOAD).
+"""
+import asyncio
+import io
+import sys
+
+ZEROCOPY = 'http.response.zerocopysend'
+
+
+class FileWrapper:
+    """wsgi.file_wrapper: файл ответа отправляет ASGIHandler."""
+
+    def __init__(self, filelike, blksize=8192):
+        self.filelike = filelike
+        self.blksize = blksize
+
+    def __iter__(self):
+        return iter(lambda: self.filelike.read(self.blksize), b'')
+
+    def close(self):
+        if hasattr(self.filelike, 'close'):
+            self.filelike.close()
+
+
+def wsgi_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        # PEP 3333: путь — байты UTF-8, прочитанные как latin-1.
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope["http_version"]}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'wsgi.file_wrapper': FileWrapper,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope['headers']:
+        name, value = name.decode('latin-1'), value.decode('latin-1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        if key in environ:
+            value = environ[key] + ',' + value
+        environ[key] = value
+    return environ
+
+
+def call_wsgi(wsgi_app, environ):
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [
+            (name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in headers
+        ]
+
+    result = wsgi_app(environ, start_response)
+    if isinstance(result, FileWrapper):
+        # Файл читает и закрывает ASGIHandler.send_file().
+        return response['status'], response['headers'], result
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return response['status'], response['headers'], body
+
+
+class ASGIHandler:
+    """ASGI-приложение: routes — пары (префикс пути, ASGI-приложение)."""
+
+    def __init__(self, wsgi_app, executor, routes=()):
+        self.wsgi_app = wsgi_app
+        self.executor = executor
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            return
+        for prefix, app in self.routes:
+            if scope['path'].startswith(prefix):
+                return await app(scope, receive, send)
+        body = b''
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        loop = asyncio.get_running_loop()
+        status, headers, content = await loop.run_in_executor(
+            self.executor, call_wsgi, self.wsgi_app,
+            wsgi_environ(scope, body),
+        )
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': headers,
+        })
+        if isinstance(content, FileWrapper):
+            try:
+                await self.send_file(scope, send, content, dict(headers))
+            finally:
+                content.close()
+            return
+        await send({'type': 'http.response.body', 'body': content})
+
+    async def send_file(self, scope, send, wrapper, headers):
+        filelike = wrapper.filelike
+        if ZEROCOPY in scope.get('extensions', {}) and hasattr(
+            filelike, 'fileno'
+        ):
+            # Сервер сам вызовет os.sendfile() с текущей позиции файла.
+            message = {'type': ZEROCOPY, 'file': filelike}
+            if b'content-length' in headers:
+                message['count'] = int(headers[b'content-length'])
+            return await send(message)
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await loop.run_in_executor(
+                self.executor, filelike.read, wrapper.blksize
+            )
+            await send({
+                'type': 'http.response.body',
+                'body': chunk,
+                'more_body': bool(chunk),
+            })
+            if not chunk:
+                return
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
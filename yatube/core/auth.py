@@ -0,0 +1,52 @@
+"""Бэкенд аутентификации с кешированным пользователем.
+
+AuthenticationMiddleware на каждый запрос достаёт пользователя из базы.
+Здесь пользователь берётся из кеша; запись сбрасывается при сохранении
+или удалении пользователя (сигналы в core/signals.py), в том числе при
+смене пароля — иначе проверка хеша сессии шла бы по старому паролю.
+Сброс виден всем воркерам только в общем кеше, поэтому с LocMemCache
+кеш пользователя выключен (USER_CACHE_TIMEOUT = 0, проверка core.W003).
+
+Пароль при входе проверяется в пуле процессов core.hashing.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from . import hashing
+
+UserModel = get_user_model()
+
+
+def user_cache_key(user_id):
+    return f'auth.user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            user = None
+        if (
+            hashing.check_password(user, password)
+            and self.user_can_authenticate(user)
+        ):
+            return user
+        return None
+
+    def get_user(self, user_id):
+        if not settings.USER_CACHE_TIMEOUT:
+            return super().get_user(user_id)
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
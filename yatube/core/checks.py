@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning, register
+
+
+@register(deploy=True)
+def check_session_cache(app_configs, **kwargs):
+    if (
+        settings.SESSION_ENGINE == 'core.sessions'
+        and settings.SESSION_WRITE_BEHIND
+        and isinstance(caches[settings.SESSION_CACHE_ALIAS], LocMemCache)
+    ):
+        return [Warning(
+            'Сессии с отложенной записью хранятся в LocMemCache.',
+            hint=(
+                'У каждого воркера свой LocMemCache: другой процесс прочитает '
+                'из базы устаревшую сессию. Используйте общий кеш.'
+            ),
+            id='core.W001',
+        )]
+    return []
+
+
+@register(deploy=True)
+def check_ratelimit_cache(app_configs, **kwargs):
+    if settings.RATELIMITS and isinstance(caches['default'], LocMemCache):
+        return [Warning(
+            'Вёдра лимитов запросов хранятся в LocMemCache.',
+            hint=(
+                'У каждого воркера свои вёдра, и лимиты RATELIMITS '
+                'умножаются на число воркеров. Используйте общий кеш.'
+            ),
+            id='core.W002',
+        )]
+    return []
+
+
+@register(deploy=True)
+def check_user_cache(app_configs, **kwargs):
+    if (
+        'core.auth.CachedModelBackend' in settings.AUTHENTICATION_BACKENDS
+        and settings.USER_CACHE_TIMEOUT
+        and isinstance(caches['default'], LocMemCache)
+    ):
+        return [Warning(
+            'Пользователи запросов кешируются в LocMemCache.',
+            hint=(
+                'Смена пароля или деактивация сбрасывает кеш только в одном '
+                'воркере, остальные до USER_CACHE_TIMEOUT пускают по старым '
+                'сессиям. Используйте общий кеш или USER_CACHE_TIMEOUT = 0.'
+            ),
+            id='core.W003',
+        )]
+    return []
+
+
+@register(deploy=True)
+def check_feed_head_cache(app_configs, **kwargs):
+    if (
+        settings.FEED_HEAD_CACHE_TIMEOUT
+        and isinstance(caches['default'], LocMemCache)
+    ):
+        return [Warning(
+            'Отметки новейших постов лент хранятся в LocMemCache.',
+            hint=(
+                'Новый пост сбрасывает отметку только в одном воркере, '
+                'остальные до FEED_HEAD_CACHE_TIMEOUT отвечают опросу, что '
+                'новых постов нет. Используйте общий кеш или '
+                'FEED_HEAD_CACHE_TIMEOUT = 0.'
+            ),
+            id='core.W004',
+        )]
+    return []
@@ -0,0 +1,14 @@
+from django.conf import settings
+
+
+def events_url(request):
+    """Адрес потока новых постов для лент (core/events.py).
+
+    Поток обслуживает только ASGI-приложение (yatube/asgi.py), оно и
+    включает EVENTS_ENABLED; под WSGI ленты обходятся опросом.
+    """
+    if not settings.EVENTS_ENABLED:
+        return {}
+    return {
+        'events_url': settings.EVENTS_URL,
+    }
@@ -0,0 +1,182 @@
+"""Поток Server-Sent Events о новых постах для открытых лент.
+
+Шина событий живёт в памяти процесса: сигналы Post публикуют в неё
+ленты (scope'ы PostCounter: 'all', 'author:N', 'group:N'), в которые
+попал новый пост, а открытые соединения /events/ подписаны на ленты
+своей страницы. Подписка не копит очередь событий, а только считает
+новые посты, поэтому тысяча простаивающих соединений — это тысяча
+корутин, ждущих asyncio.Event, и тысяча целых чисел.
+
+Поток работает только под ASGI (yatube/asgi.py): Django-запросы там
+выполняются в потоках того же процесса, и публикация из потока
+передаётся в цикл событий через call_soon_threadsafe. Под WSGI
+подписчиков нет и публикация ничего не делает.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qsl
+
+from django.conf import settings
+
+from . import metrics
+
+
+class Subscription:
+    def __init__(self, scopes, loop):
+        self.scopes = scopes
+        self.loop = loop
+        self.pending = 0
+        self.ready = asyncio.Event()
+
+    def notify(self):
+        # Вызывается только в цикле событий подписчика.
+        self.pending += 1
+        self.ready.set()
+
+    def take(self):
+        pending, self.pending = self.pending, 0
+        self.ready.clear()
+        return pending
+
+
+class EventBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def subscribe(self, scopes):
+        """Подписывает на ленты; вызывать из цикла событий."""
+        subscription = Subscription(
+            frozenset(scopes), asyncio.get_running_loop()
+        )
+        with self._lock:
+            self._count += 1
+            for scope in subscription.scopes:
+                self._subscribers[scope].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._count -= 1
+            for scope in subscription.scopes:
+                subscribers = self._subscribers[scope]
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[scope]
+
+    def publish(self, scopes):
+        """Сообщает о новом посте в лентах scopes; из любого потока."""
+        with self._lock:
+            targets = set().union(*(
+                self._subscribers.get(scope, ()) for scope in scopes
+            ))
+        for subscription in targets:
+            subscription.loop.call_soon_threadsafe(subscription.notify)
+
+
+bus = EventBus()
+
+
+def session_key(scope):
+    for name, value in scope['headers']:
+        if name == b'cookie':
+            cookie = SimpleCookie(value.decode('latin-1'))
+            morsel = cookie.get(settings.SESSION_COOKIE_NAME)
+            return morsel.value if morsel else None
+    return None
+
+
+async def send_response(send, status, body=b''):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'text/plain; charset=utf-8')],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+class EventStream:
+    """ASGI-приложение потока событий.
+
+    resolve(params, session_key) -> scopes вызывается в потоке
+    executor'а (ему нужна база) и возвращает ленты страницы или None,
+    если ленту открыть нельзя.
+    """
+
+    def __init__(self, resolve, executor=None):
+        self.resolve = resolve
+        self.executor = executor
+
+    async def __call__(self, scope, receive, send):
+        if scope['method'] != 'GET':
+            return await send_response(send, 405)
+        if len(bus) >= settings.EVENTS_MAX_CONNECTIONS:
+            metrics.incr('events.rejected', 'events')
+            return await send_response(send, 503)
+        params = dict(parse_qsl(scope['query_string'].decode('latin-1')))
+        loop = asyncio.get_running_loop()
+        scopes = await loop.run_in_executor(
+            self.executor, self.resolve, params, session_key(scope)
+        )
+        if not scopes:
+            return await send_response(send, 404)
+        subscription = bus.subscribe(scopes)
+        disconnected = asyncio.ensure_future(self.wait_disconnect(receive))
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream'),
+                    (b'cache-control', b'no-cache'),
+                    # Не даём nginx буферизовать поток.
+                    (b'x-accel-buffering', b'no'),
+                ],
+            })
+            await self.write(send, 'retry: %d\n\n' % (
+                settings.EVENTS_RETRY * 1000
+            ))
+            await self.stream(subscription, disconnected, send)
+        finally:
+            bus.unsubscribe(subscription)
+            disconnected.cancel()
+
+    async def stream(self, subscription, disconnected, send):
+        while not disconnected.done():
+            waiter = asyncio.ensure_future(subscription.ready.wait())
+            await asyncio.wait(
+                (waiter, disconnected),
+                timeout=settings.EVENTS_HEARTBEAT,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            waiter.cancel()
+            if disconnected.done():
+                return
+            count = subscription.take()
+            if count:
+                data = json.dumps({'new': count})
+                await self.write(send, f'event: posts\ndata: {data}\n\n')
+            else:
+                # Комментарий SSE: держит соединение через прокси и
+                # обнаруживает отвалившихся клиентов.
+                await self.write(send, ': ping\n\n')
+
+    @staticmethod
+    async def write(send, text):
+        await send({
+            'type': 'http.response.body',
+            'body': text.encode(),
+            'more_body': True,
+        })
+
+    @staticmethod
+    async def wait_disconnect(receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
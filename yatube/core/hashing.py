@@ -0,0 +1,152 @@
+"""Хеширование паролей в отдельных процессах.
+
+PBKDF2 специально медленный: после сбоя волна входов занимает процессор
+всех воркеров, и лента перестаёт отвечать. Здесь хеширование выполняет
+пул из PASSWORD_HASHING_WORKERS процессов. Очередь ограничена:
+- заданий в очереди не больше PASSWORD_HASHING_QUEUE, лишние сразу
+  получают HashingBusy (ответ 503);
+- задание, прождавшее в очереди дольше PASSWORD_HASHING_MAX_WAIT секунд,
+  не выполняется: пользователь, скорее всего, уже ушёл.
+
+Устаревший хеш (другой алгоритм или меньше итераций) при успешном входе
+тут же пересчитывается в том же процессе пула. Время ожидания и
+хеширования попадает в счётчики core.metrics. При
+PASSWORD_HASHING_WORKERS = 0 всё выполняется в текущем потоке. Если
+процесс пула упал, пул пересоздаётся, а запросы на нём получают
+HashingBusy.
+"""
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from . import metrics
+
+EXPIRED = 'expired'
+
+
+class HashingBusy(Exception):
+    """Очередь хеширования переполнена или ожидание истекло."""
+
+
+def _init_worker():
+    # При запуске процессов через spawn Django в них ещё не настроен.
+    django.setup()
+
+
+def _check(password, encoded, submitted):
+    if time.time() - submitted > settings.PASSWORD_HASHING_MAX_WAIT:
+        return EXPIRED
+    started = time.time()
+    valid = must_update = False
+    if encoded is not None:
+        preferred = hashers.get_hasher()
+        try:
+            hasher = hashers.identify_hasher(encoded)
+        except ValueError:
+            hasher = None
+        valid = hasher is not None and hasher.verify(password, encoded)
+        must_update = hasher is not None and (
+            hasher.algorithm != preferred.algorithm
+            or hasher.must_update(encoded)
+        )
+    else:
+        # Пользователя нет: тратим столько же времени, чтобы по времени
+        # ответа нельзя было узнать, существует ли логин.
+        hashers.make_password(password)
+    upgraded = None
+    if valid and must_update:
+        upgraded = hashers.make_password(password)
+    return valid, upgraded, started - submitted, time.time() - started
+
+
+def _make(password, submitted):
+    if time.time() - submitted > settings.PASSWORD_HASHING_MAX_WAIT:
+        return EXPIRED
+    started = time.time()
+    encoded = hashers.make_password(password)
+    return encoded, started - submitted, time.time() - started
+
+
+class HashingPool:
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self._queued = 0
+
+    def run(self, func, *args):
+        workers = settings.PASSWORD_HASHING_WORKERS
+        if not workers:
+            return func(*args, time.time())
+        with self._lock:
+            if self._queued >= settings.PASSWORD_HASHING_QUEUE:
+                metrics.incr('password_hashing.rejected', func.__name__)
+                raise HashingBusy
+            self._queued += 1
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_worker
+                )
+            executor = self._executor
+        try:
+            future = executor.submit(func, *args, time.time())
+            # Запас сверх ожидания в очереди — на само хеширование.
+            result = future.result(
+                timeout=settings.PASSWORD_HASHING_MAX_WAIT * 2
+            )
+        except TimeoutError:
+            result = EXPIRED
+        except BrokenProcessPool:
+            # Процесс пула упал (например, его убил OOM killer): такой
+            # пул не принимает заданий, следующий запрос создаст новый.
+            self._discard(executor)
+            metrics.incr('password_hashing.broken', func.__name__)
+            raise HashingBusy
+        finally:
+            with self._lock:
+                self._queued -= 1
+        if result == EXPIRED:
+            metrics.incr('password_hashing.expired', func.__name__)
+            raise HashingBusy
+        return result
+
+    def _discard(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+
+pool = HashingPool()
+
+
+def _record(kind, waited, spent):
+    metrics.incr('password_hashing.calls', kind)
+    metrics.incr('password_hashing.wait_ms', kind, waited * 1000)
+    metrics.incr('password_hashing.hash_ms', kind, spent * 1000)
+
+
+def check_password(user, password):
+    """Проверяет пароль пользователя (None — пользователя нет).
+
+    Устаревший хеш при успешной проверке сохраняется заново.
+    """
+    encoded = None
+    if user is not None and user.has_usable_password():
+        encoded = user.password
+    valid, upgraded, waited, spent = pool.run(_check, password, encoded)
+    _record('check', waited, spent)
+    if upgraded:
+        user.password = upgraded
+        user.save(update_fields=['password'])
+    return valid
+
+
+def make_password(password):
+    encoded, waited, spent = pool.run(_make, password)
+    _record('make', waited, spent)
+    return encoded
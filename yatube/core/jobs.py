@@ -0,0 +1,96 @@
+"""Фоновые задания с отчётом о прогрессе.
+
+Задание — строка Job с типом и объектом. Обработчик типа регистрируется
+декоратором register и сам сообщает прогресс через job.set_total() и
+job.progress(). Задания выполняет команда run_jobs (cron или отдельный
+процесс), а при JOBS_RUN_IN_THREAD — ещё и фоновый поток, запускаемый
+после фиксации транзакции, в которой задание поставлено. Выполненные
+задания старше JOBS_KEEP_DONE run_jobs удаляет (prune), иначе строка на
+каждый пост автора с подписчиками копилась бы вечно.
+"""
+import json
+import logging
+import threading
+import traceback
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+_handlers = {}
+
+
+def register(kind):
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, target='', params=None):
+    job = Job.objects.create(
+        kind=kind,
+        target=str(target),
+        payload=json.dumps(params) if params else '',
+    )
+    if settings.JOBS_RUN_IN_THREAD:
+        transaction.on_commit(lambda: _start_thread(job.pk))
+    return job
+
+
+def _start_thread(pk):
+    def target():
+        try:
+            run_pending(pks=[pk])
+        except DatabaseError:
+            # База занята: задание осталось в очереди и его выполнит run_jobs.
+            logger.warning('Задание %s не запущено', pk, exc_info=True)
+        finally:
+            connection.close()
+    threading.Thread(target=target, name=f'job-{pk}', daemon=True).start()
+
+
+def run(job):
+    try:
+        _handlers[job.kind](job)
+    except Exception:
+        logger.exception('Задание %s завершилось ошибкой', job)
+        job.status = Job.FAILED
+        job.error = traceback.format_exc()
+    else:
+        job.status = Job.DONE
+    job.save(update_fields=['status', 'error', 'updated'])
+    return job
+
+
+def run_pending(pks=None):
+    """Выполняет задания из очереди; возвращает выполненные."""
+    jobs = Job.objects.filter(status=Job.PENDING).order_by('created')
+    if pks is not None:
+        jobs = jobs.filter(pk__in=pks)
+    finished = []
+    for pk in jobs.values_list('pk', flat=True):
+        # Задание забирает тот, кто первым сменил статус.
+        if not Job.objects.filter(pk=pk, status=Job.PENDING).update(
+            status=Job.RUNNING
+        ):
+            continue
+        finished.append(run(Job.objects.get(pk=pk)))
+    return finished
+
+
+def prune(keep=None):
+    """Удаляет пачками выполненные задания старше keep; возвращает число."""
+    keep = settings.JOBS_KEEP_DONE if keep is None else keep
+    old = Job.objects.filter(
+        status=Job.DONE, updated__lt=timezone.now() - keep
+    ).order_by('pk').values_list('pk', flat=True)
+    deleted = 0
+    while True:
+        pks = list(old[:settings.PURGE_BATCH_SIZE])
+        if not pks:
+            return deleted
+        deleted += Job.objects.filter(pk__in=pks).delete()[0]
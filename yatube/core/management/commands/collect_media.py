@@ -0,0 +1,163 @@
+import os
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import models
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore
+
+from core.models import MediaBlob
+from core.storage import delete_media
+
+
+def walk_files(root):
+    """Обходит дерево каталогов, не собирая его целиком в память."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def file_fields():
+    """Все файловые поля моделей проекта."""
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField):
+                yield model, field
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из MEDIA_ROOT файлы и миниатюры, '
+        'на которые не ссылается ни одна запись в базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько файлов проверять одним запросом.',
+        )
+        parser.add_argument(
+            '--max-rate', type=float, default=0,
+            help='Не больше стольких удалений в секунду (0 — без лимита).',
+        )
+        parser.add_argument(
+            '--grace', type=int, default=3600,
+            help='Не трогать файлы моложе стольких секунд.',
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.interval = (
+            1 / options['max_rate'] if options['max_rate'] > 0 else 0
+        )
+        self.fields = list(file_fields())
+        # Ключи sorl-thumbnail зависят от хранилища, поэтому исходник
+        # удаляется через каждое хранилище, смотрящее в MEDIA_ROOT.
+        self.storages = [default_storage] + [
+            field.storage for _, field in self.fields
+            if field.storage is not default_storage
+            and getattr(field.storage, 'location', None)
+            == default_storage.location
+        ]
+        self.grace = timedelta(seconds=options['grace'])
+        cutoff = time.time() - options['grace']
+        root = settings.MEDIA_ROOT
+        if not os.path.isdir(root):
+            return
+        entries = (
+            entry for entry in walk_files(root)
+            if entry.stat(follow_symlinks=False).st_mtime < cutoff
+        )
+        names = (
+            os.path.relpath(entry.path, root).replace(os.sep, '/')
+            for entry in entries
+        )
+        checked = deleted = 0
+        for batch in batches(names, options['batch_size']):
+            checked += len(batch)
+            thumbnails = {
+                name for name in batch
+                if name.startswith(thumbnail_settings.THUMBNAIL_PREFIX)
+            }
+            originals = [name for name in batch if name not in thumbnails]
+            for name in self.orphan_thumbnails(thumbnails):
+                deleted += self.delete(name, default_storage.delete)
+            for name in self.orphan_originals(originals):
+                deleted += self.delete(name, self.delete_original)
+        verb = 'Будет удалено' if self.dry_run else 'Удалено'
+        self.stdout.write(f'Проверено файлов: {checked}. {verb}: {deleted}.')
+
+    def orphan_originals(self, names):
+        referenced = set()
+        for model, field in self.fields:
+            referenced.update(
+                model._default_manager
+                .filter(**{f'{field.attname}__in': names})
+                .values_list(field.attname, flat=True)
+            )
+        # Файл мог быть только что загружен, а пост с ним ещё не сохранён.
+        referenced.update(
+            MediaBlob.objects.filter(name__in=names).exclude(
+                pk__in=MediaBlob.objects.unreferenced(self.grace)
+            ).values_list('name', flat=True)
+        )
+        return [name for name in names if name not in referenced]
+
+    def orphan_thumbnails(self, names):
+        # Миниатюра жива, пока о ней помнит хранилище ключей sorl-thumbnail;
+        # оно очищается при удалении исходного файла через delete_media().
+        keys = {
+            add_prefix(ImageFile(name, default_storage).key): name
+            for name in names
+        }
+        known = set(
+            KVStore.objects.filter(key__in=keys).values_list('key', flat=True)
+        )
+        return [name for key, name in keys.items() if key not in known]
+
+    def delete_original(self, name):
+        # Проверка выше могла устареть на минуты (--max-rate): файл с
+        # записью удаляет collect_one, заново проверив её при удалении.
+        if MediaBlob.objects.collect_one(name, self.storages, self.grace):
+            return True
+        if MediaBlob.objects.filter(name=name).exists():
+            return False
+        # Файл без записи (загружен до учёта ссылок).
+        for storage in self.storages:
+            delete_media(storage, name)
+        return True
+
+    def delete(self, name, delete):
+        if self.dry_run:
+            self.stdout.write(name)
+            return 1
+        if delete(name) is False:
+            return 0
+        if self.interval:
+            time.sleep(self.interval)
+        return 1
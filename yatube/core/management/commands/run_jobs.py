@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.jobs import prune, run_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задания из очереди и удаляет выполненные '
+        'задания старше JOBS_KEEP_DONE.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', type=float, metavar='SECONDS',
+            help='Не завершаться, проверять очередь с этим интервалом.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            for job in run_pending():
+                self.stdout.write(str(job))
+            pruned = prune()
+            if pruned:
+                self.stdout.write(f'Удалено старых заданий: {pruned}.')
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -0,0 +1,106 @@
+"""Разметка текстов: небольшое подмножество Markdown.
+
+Поддерживаются абзацы (пустая строка), переносы строк, **жирный**,
+*курсив*, `код`, ссылки [текст](https://...), автоссылки на http(s)://,
+#теги и @упоминания (ссылки на них строит функция link у render()).
+Весь текст пользователя экранируется, а теги добавляет только сам
+разметчик, поэтому результат безопасен без отдельной очистки HTML.
+
+Тексты размечаются один раз при сохранении модели (см. Post.save), а
+шаблоны выводят готовые text_html и text_preview.
+"""
+import re
+from html import escape
+
+from django.utils.text import Truncator
+
+INLINE_RE = re.compile(
+    r'`(?P<code>[^`\n]+)`'
+    r'|\[(?P<label>[^\]\n]+)\]\((?P<href>https?://[^\s()<>]+)\)'
+    r'|(?P<url>https?://[^\s<>"\']*[^\s<>"\'.,:;!?)\]])'
+    r'|(?<![\w#&])#(?P<tag>\w{1,50})'
+    r'|(?<![\w@])@(?P<mention>\w[\w.+-]{0,148}(?<=[\w+-]))'
+)
+BOLD_RE = re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*')
+ITALIC_RE = re.compile(r'(?<![*\w])\*(?=[^\s*])([^*\n]+?)(?<=\S)\*(?![*\w])')
+PARAGRAPH_RE = re.compile(r'\n\s*\n')
+
+
+def _inline(text, token, emphasis):
+    """Размечает строку: token — для кода и ссылок, emphasis — для
+    текста между ними."""
+    parts = []
+    position = 0
+    for match in INLINE_RE.finditer(text):
+        parts.append(emphasis(text[position:match.start()]))
+        parts.append(token(match))
+        position = match.end()
+    parts.append(emphasis(text[position:]))
+    return ''.join(parts)
+
+
+def _html_emphasis(text):
+    text = BOLD_RE.sub(r'<strong>\1</strong>', escape(text))
+    return ITALIC_RE.sub(r'<em>\1</em>', text)
+
+
+def _html_token(match, link):
+    if match['code']:
+        return f'<code>{escape(match["code"])}</code>'
+    for kind, prefix in (('tag', '#'), ('mention', '@')):
+        if match[kind]:
+            url = link(kind, match[kind]) if link else None
+            text = escape(prefix + match[kind])
+            return f'<a href="{escape(url)}">{text}</a>' if url else text
+    href = match['href'] or match['url']
+    label = _html_emphasis(match['label']) if match['label'] else escape(href)
+    return f'<a href="{escape(href)}" rel="nofollow ugc">{label}</a>'
+
+
+def _plain_emphasis(text):
+    return ITALIC_RE.sub(r'\1', BOLD_RE.sub(r'\1', text))
+
+
+def _plain_token(match):
+    if match['tag'] or match['mention']:
+        return match.group()
+    return match['code'] or match['label'] or match['url']
+
+
+def render(text, link=None):
+    """Возвращает безопасный HTML текста.
+
+    link(kind, value) — адрес тега (kind='tag') или упомянутого
+    пользователя (kind='mention'); None оставляет их текстом.
+    """
+    def token(match):
+        return _html_token(match, link)
+
+    paragraphs = PARAGRAPH_RE.split(text.replace('\r\n', '\n').strip())
+    return '\n'.join(
+        '<p>' + '<br>\n'.join(
+            _inline(line, token, _html_emphasis)
+            for line in paragraph.strip().split('\n')
+        ) + '</p>'
+        for paragraph in paragraphs if paragraph.strip()
+    )
+
+
+def preview(text, length):
+    """Начало текста без разметки, не длиннее length символов."""
+    plain = ' '.join(_inline(text, _plain_token, _plain_emphasis).split())
+    return Truncator(plain).chars(length)
+
+
+def entities(text):
+    """Теги (в нижнем регистре) и упомянутые имена пользователей.
+
+    Теги внутри `кода` и адресов ссылок не считаются.
+    """
+    tags, mentions = set(), set()
+    for match in INLINE_RE.finditer(text):
+        if match['tag']:
+            tags.add(match['tag'].lower())
+        elif match['mention']:
+            mentions.add(match['mention'])
+    return tags, mentions
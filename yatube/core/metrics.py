@@ -0,0 +1,34 @@
+"""Простые счётчики производительности внутри процесса.
+
+Счётчики живут в памяти воркера и обнуляются при перезапуске; их видно
+на странице /metrics/ (только для персонала). Для агрегации по всем
+воркерам страницу опрашивает внешний сборщик.
+"""
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters = defaultdict(lambda: defaultdict(float))
+
+
+def incr(metric, key, value=1):
+    """Увеличивает счётчик metric с меткой key (обычно имя view)."""
+    with _lock:
+        _counters[metric][key] += value
+
+
+def snapshot():
+    with _lock:
+        return {
+            metric: dict(values) for metric, values in _counters.items()
+        }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unresolved'
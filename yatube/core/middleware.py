@@ -0,0 +1,189 @@
+import gzip
+import re
+
+from django.conf import settings
+from django.shortcuts import render
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence
+
+from . import metrics
+from .hashing import HashingBusy
+from .serving import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # brotli не обязателен: без него сжимаем только gzip
+    brotli = None
+
+# Внутри этих тегов пробелы значимы (или это не HTML) — их не трогаем.
+PROTECTED_RE = re.compile(
+    r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.S | re.I
+)
+# Пробелы в значениях атрибутов видны пользователю или уходят с формой,
+# а комментарии могут быть условными — их не трогаем.
+QUOTED_RE = re.compile(r'("[^"]*"|\'[^\']*\')')
+TAG_RE = re.compile(
+    r'(<!--.*?-->|<(?:[^>"\']|"[^"]*"|\'[^\']*\')*>)', re.S
+)
+NEWLINE_RUN_RE = re.compile(r'[ \t\r\f\v]*\n\s*')
+SPACE_RUN_RE = re.compile(r'[ \t\r\f\v]{2,}')
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript',
+    'application/xml', 'image/svg+xml',
+)
+
+
+def _collapse(text):
+    text = NEWLINE_RUN_RE.sub('\n', text)
+    return SPACE_RUN_RE.sub(' ', text)
+
+
+def _collapse_tag(tag):
+    if tag.startswith('<!--'):
+        return tag
+    pieces = QUOTED_RE.split(tag)
+    # Нечётные куски — значения атрибутов в кавычках.
+    pieces[::2] = [_collapse(text) for text in pieces[::2]]
+    return ''.join(pieces)
+
+
+def minify_html(html):
+    """Сжимает незначимые пробелы в HTML.
+
+    Последовательность пробельных символов браузер отображает как один
+    пробел, поэтому отступы схлопываются до одного перевода строки, а
+    подряд идущие пробелы — до одного. Значения атрибутов в кавычках
+    (title, value, data-* и т. п.), комментарии и содержимое <pre>,
+    <textarea>, <script> и <style> остаются нетронутыми.
+    """
+    parts = PROTECTED_RE.split(html)
+    # split() с двумя группами возвращает тройки: текст, блок, имя тега.
+    for index in range(0, len(parts), 3):
+        pieces = TAG_RE.split(parts[index])
+        # Нечётные куски — теги и комментарии.
+        parts[index] = ''.join(
+            _collapse_tag(piece) if number % 2 else _collapse(piece)
+            for number, piece in enumerate(pieces)
+        )
+    return ''.join(
+        part for index, part in enumerate(parts) if index % 3 != 2
+    ).strip()
+
+
+class HtmlMinifyMiddleware(MiddlewareMixin):
+    """Убирает из HTML-страниц отступы шаблонов."""
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or response.status_code != 200
+            or response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith('text/html')
+        ):
+            return response
+        charset = response.charset
+        original = response.content
+        minified = minify_html(original.decode(charset)).encode(charset)
+        saved = len(original) - len(minified)
+        if saved > 0:
+            response.content = minified
+            if response.has_header('Content-Length'):
+                response['Content-Length'] = str(len(minified))
+            metrics.incr('html_minify.bytes_saved', metrics.view_name(request),
+                         saved)
+        return response
+
+
+class HashingBusyMiddleware(MiddlewareMixin):
+    """Отвечает 503, если пул хеширования паролей перегружен.
+
+    Пароль проверяют не только вход и регистрация, но и вход в админку,
+    смена пароля и любые другие вызовы authenticate(), поэтому
+    HashingBusy перехватывается здесь, а не в каждом view.
+    """
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, HashingBusy):
+            return None
+        response = render(request, 'core/503.html', status=503)
+        response['Retry-After'] = '5'
+        return response
+
+
+def brotli_sequence(sequence):
+    compressor = brotli.Compressor()
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+        # Сбрасываем буфер, чтобы куски потока уходили клиенту сразу.
+        yield compressor.flush()
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжимает ответы brotli или gzip.
+
+    Не сжимаются короткие ответы (COMPRESSION_MIN_SIZE), уже сжатые,
+    несжимаемые типы и — из-за атаки BREACH — страницы с CSRF-токеном:
+    секрет в сжатом ответе рядом с отражённым вводом пользователя можно
+    подобрать по длине ответа. Шаблонный тег {% csrf_token %} выставляет
+    флаг CSRF_COOKIE_USED, по нему такие страницы и узнаём.
+    """
+
+    def process_response(self, request, response):
+        if (
+            response.has_header('Content-Encoding')
+            or response.status_code not in (200, 404)
+            or not response.get('Content-Type', '').startswith(
+                COMPRESSIBLE_TYPES)
+            or response.get('Content-Type', '').startswith(
+                'text/event-stream')
+        ):
+            return response
+        if not response.streaming and (
+            len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if request.META.get('CSRF_COOKIE_USED'):
+            metrics.incr('compression.breach_skipped',
+                         metrics.view_name(request))
+            return response
+
+        accepted = accepted_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''), ('br', 'gzip')
+        )
+        if brotli is not None and 'br' in accepted:
+            encoding = 'br'
+        elif 'gzip' in accepted:
+            encoding = 'gzip'
+        else:
+            return response
+
+        if response.streaming:
+            response.streaming_content = (
+                brotli_sequence(response.streaming_content)
+                if encoding == 'br'
+                else compress_sequence(response.streaming_content)
+            )
+            del response['Content-Length']
+        else:
+            compressed = (
+                brotli.compress(response.content, quality=5)
+                if encoding == 'br'
+                else gzip.compress(response.content, 6, mtime=0)
+            )
+            if len(compressed) >= len(response.content):
+                return response
+            metrics.incr('compression.bytes_saved', metrics.view_name(request),
+                         len(response.content) - len(compressed))
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('kind', models.CharField(max_length=100, verbose_name='Тип')),
+                ('target', models.CharField(blank=True, max_length=255, verbose_name='Объект')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Готово'), ('failed', 'Ошибка')], db_index=True, default='pending', max_length=20, verbose_name='Статус')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Всего')),
+                ('done', models.PositiveIntegerField(default=0, verbose_name='Выполнено')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Фоновое задание',
+                'verbose_name_plural': 'Фоновые задания',
+                'ordering': ['-created'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='payload',
+            field=models.TextField(blank=True, verbose_name='Параметры (JSON)'),
+        ),
+    ]
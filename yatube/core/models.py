@@ -1,4 +1,9 @@
-from django.db import models
+import json
+from datetime import timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils import timezone
 
 
 class CreatedModel(models.Model):
@@ -11,3 +16,132 @@ class CreatedModel(models.Model):
     class Meta:
         # Это абстрактная модель:
         abstract = True
+
+
+class MediaBlobManager(models.Manager):
+    def touch(self, name):
+        """Регистрирует файл или продлевает ему срок жизни."""
+        if not self.filter(name=name).update(updated=timezone.now()):
+            try:
+                with transaction.atomic():
+                    self.create(name=name)
+            except IntegrityError:
+                pass
+
+    def acquire(self, name):
+        """Увеличивает счётчик ссылок на файл."""
+        updated = self.filter(name=name).update(
+            refcount=F('refcount') + 1,
+            updated=timezone.now(),
+        )
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                self.create(name=name, refcount=1)
+        except IntegrityError:
+            self.acquire(name)
+
+    def release(self, name):
+        """Уменьшает счётчик ссылок на файл."""
+        self.filter(name=name, refcount__gt=0).update(
+            refcount=F('refcount') - 1,
+            updated=timezone.now(),
+        )
+
+    def unreferenced(self, grace=timedelta(hours=1)):
+        """Файлы без ссылок, которые не трогали дольше grace."""
+        return self.filter(
+            refcount=0,
+            updated__lt=timezone.now() - grace,
+        )
+
+    def collect_one(self, name, storages, grace=timedelta(hours=1)):
+        """Удаляет файл из хранилищ storages, если на него нет ссылок
+        дольше grace; возвращает, удалён ли он."""
+        from .storage import delete_media
+
+        # Запись удаляется условно и до файла: если файл успели снова
+        # использовать или хотя бы загрузить те же байты (touch), счётчик
+        # не нулевой или запись свежая, и файл остаётся.
+        deleted, _ = self.unreferenced(grace).filter(name=name).delete()
+        if not deleted:
+            return False
+        for storage in storages:
+            delete_media(storage, name)
+        return True
+
+
+class MediaBlob(CreatedModel):
+    """Файл в хранилище с адресацией по содержимому."""
+    name = models.CharField('Имя файла', max_length=255, unique=True)
+    refcount = models.PositiveIntegerField('Число ссылок', default=0)
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
+
+    objects = MediaBlobManager()
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = 'Медиафайл'
+        verbose_name_plural = 'Медиафайлы'
+        indexes = [
+            models.Index(fields=['refcount', 'updated']),
+        ]
+
+
+class Job(CreatedModel):
+    """Фоновое задание с прогрессом (см. core/jobs.py)."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    kind = models.CharField('Тип', max_length=100)
+    target = models.CharField('Объект', max_length=255, blank=True)
+    status = models.CharField(
+        'Статус', max_length=20, choices=STATUSES, default=PENDING,
+        db_index=True
+    )
+    total = models.PositiveIntegerField('Всего', default=0)
+    done = models.PositiveIntegerField('Выполнено', default=0)
+    error = models.TextField('Ошибка', blank=True)
+    payload = models.TextField('Параметры (JSON)', blank=True)
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
+
+    def __str__(self):
+        return f'{self.kind} {self.target}: {self.get_status_display()}'
+
+    @property
+    def params(self):
+        return json.loads(self.payload) if self.payload else {}
+
+    @property
+    def percent(self):
+        if self.status == self.DONE:
+            return 100
+        return min(100, self.done * 100 // self.total) if self.total else 0
+
+    def set_total(self, total):
+        self.total = total
+        Job.objects.filter(pk=self.pk).update(
+            total=total, updated=timezone.now()
+        )
+
+    def progress(self, count):
+        self.done += count
+        Job.objects.filter(pk=self.pk).update(
+            done=F('done') + count, updated=timezone.now()
+        )
+
+    class Meta:
+        ordering = ['-created']
+        verbose_name = 'Фоновое задание'
+        verbose_name_plural = 'Фоновые задания'
@@ -0,0 +1,47 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.utils.functional import cached_property
+
+COUNT_CACHE_TIMEOUT = 60
+
+
+class EstimatedCountPaginator(Paginator):
+    """Паджинатор админки без точного COUNT(*) на каждую страницу.
+
+    Без фильтров число строк берётся из статистики PostgreSQL
+    (pg_class.reltuples); в остальных случаях COUNT(*) выполняется раз в
+    минуту для каждого запроса и кешируется. Для навигации по страницам
+    неточность в несколько строк не важна.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is None:
+            return super().count
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # reltuples = -1 или 0 у таблицы, которую ещё не анализировали.
+            if row and row[0] > 0:
+                return int(row[0])
+        try:
+            sql = str(query)
+        except EmptyResultSet:
+            return 0
+        key = 'estimated-count:' + hashlib.md5(
+            f'{queryset.db}:{sql}'.encode()
+        ).hexdigest()
+        return cache.get_or_set(
+            key, lambda: Paginator.count.func(self), COUNT_CACHE_TIMEOUT
+        )
@@ -0,0 +1,170 @@
+"""Ограничение частоты запросов на запись (token bucket).
+
+У каждого ключа — вью, области и клиента — своё ведро на N токенов,
+которое равномерно наполняется за период: '10/m' — 10 запросов подряд,
+дальше по одному раз в 6 секунд. Запрос забирает токен, пустое ведро даёт
+429 с заголовком Retry-After.
+
+Ведро хранится в кеше default парой (токены, время). Лимит общий для
+всех воркеров, только если кеш общий (Redis, Memcached); с LocMemCache
+у каждого процесса свои вёдра и лимит умножается на число воркеров —
+об этом предупреждает проверка core.W002. Чтение и запись вёдер
+выполняются под короткими замками из cache.add(): add атомарен во всех
+бэкендах кеша Django, так что два параллельных запроса не потратят один
+и тот же токен. Если замок не удалось взять за несколько попыток, запрос
+отклоняется с Retry-After в LOCK_BUSY_WAIT секунд: занятый замок — это
+и есть параллельные запросы к тому же ведру, а пропуск без токена
+позволил бы обойти лимит, просто посылая запросы одновременно. Замок
+живёт не дольше секунды, так что упавший запрос ведро не заблокирует.
+
+Токены забираются, только если их хватает во всех вёдрах запроса:
+отклонённый по IP запрос не тратит ведро пользователя.
+
+Лимиты задаются в settings.RATELIMITS по имени URL и применяются
+RateLimitMiddleware; для отдельных вью есть декоратор ratelimit.
+"""
+import math
+import re
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
+from django.utils.deprecation import MiddlewareMixin
+
+from . import metrics
+
+RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])$')
+UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+LOCK_ATTEMPTS = 5
+LOCK_WAIT = 0.005
+LOCK_BUSY_WAIT = 1
+
+
+def parse_rate(rate):
+    """'10/m' → (10, 60), '100/5m' → (100, 300)."""
+    match = RATE_RE.match(rate)
+    if not match:
+        raise ValueError(f'Неверный лимит: {rate!r}')
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * UNITS[unit]
+
+
+def client_ip(request):
+    # За прокси REMOTE_ADDR должен выставлять сам прокси или WSGI-сервер;
+    # X-Forwarded-For от клиента подделывается, ему не верим.
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def bucket_key(request, name, scope):
+    """Ключ ведра; у анонимов область 'user' сводится к IP."""
+    user = getattr(request, 'user', None)
+    if scope == 'user' and user is not None and user.is_authenticated:
+        client = f'user:{user.pk}'
+    else:
+        client = f'ip:{client_ip(request)}'
+    return f'ratelimit:{name}:{scope}:{client}'
+
+
+def _lock(keys):
+    """Берёт замки вёдер; возвращает их ключи или None, если не вышло."""
+    locks = []
+    # Порядок один для всех запросов, чтобы они не ждали друг друга
+    # по кругу.
+    for key in sorted(keys):
+        lock = f'{key}:lock'
+        for _ in range(LOCK_ATTEMPTS):
+            if cache.add(lock, 1, 1):
+                break
+            time.sleep(LOCK_WAIT)
+        else:
+            cache.delete_many(locks)
+            return None
+        locks.append(lock)
+    return locks
+
+
+def take(buckets, now=None):
+    """Забирает по токену из каждого ведра {ключ: лимит}, если токены
+    есть во всех; иначе не трогает вёдра и возвращает, сколько секунд
+    ждать."""
+    locks = _lock(buckets)
+    if locks is None:
+        metrics.incr('ratelimit.lock_busy', next(iter(buckets)).split(':')[1])
+        return LOCK_BUSY_WAIT
+    try:
+        now = time.time() if now is None else now
+        stored = cache.get_many(list(buckets))
+        wait = 0
+        updates = []
+        for key, rate in buckets.items():
+            count, period = parse_rate(rate)
+            refill = count / period
+            tokens, stamp = stored.get(key, (count, now))
+            tokens = min(count, tokens + (now - stamp) * refill)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / refill)
+            # За период простоя ведро наполнится целиком — дольше не храним.
+            updates.append((key, (tokens - 1, now), period))
+        if wait:
+            return wait
+        for key, value, period in updates:
+            cache.set(key, value, period)
+        return 0
+    finally:
+        cache.delete_many(locks)
+
+
+def consume(key, rate, now=None):
+    """Забирает токен; возвращает 0 или сколько секунд ждать до следующего."""
+    return take({key: rate}, now)
+
+
+def check(request, name, rates):
+    """Забирает токены из вёдер всех областей; возвращает время ожидания."""
+    return take({
+        bucket_key(request, name, scope): rate
+        for scope, rate in rates.items()
+    })
+
+
+def too_many_requests(request, name, wait):
+    metrics.incr('ratelimit.rejected', name)
+    response = render(request, 'core/429.html', status=429)
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+def ratelimit(rates, methods=('POST',), name=None):
+    """Декоратор: ratelimit({'user': '10/m', 'ip': '30/m'})."""
+    def decorator(view):
+        key = name or f'{view.__module__}.{view.__name__}'
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method in methods:
+                wait = check(request, key, rates)
+                if wait:
+                    return too_many_requests(request, key, wait)
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
+
+
+class RateLimitMiddleware(MiddlewareMixin):
+    """Применяет settings.RATELIMITS к вью по имени их URL.
+
+    Формат: {'posts:add_comment': {'rates': {'user': '10/m'},
+    'methods': ('POST',)}}; methods по умолчанию — только POST.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        limit = settings.RATELIMITS.get(match.view_name) if match else None
+        if not limit or request.method not in limit.get('methods', ('POST',)):
+            return None
+        wait = check(request, match.view_name, limit['rates'])
+        if wait:
+            return too_many_requests(request, match.view_name, wait)
+        return None
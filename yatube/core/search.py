@@ -0,0 +1,69 @@
+"""Полнотекстовый поиск для админки.
+
+Поиск админки по умолчанию — LIKE '%слово%' по каждому полю, то есть
+полный просмотр таблицы. На SQLite для текстов постов и комментариев
+заведены FTS5-индексы (внешнее содержимое, синхронизация триггерами —
+см. миграции posts), и поиск идёт по ним. На других базах или без FTS5
+используется обычный поиск Django.
+"""
+import copy
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+
+def fts_available(table):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def fts_query(term):
+    """Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки (операторы FTS5 не работают) и ищется
+    по префиксу; все слова должны встретиться.
+    """
+    words = term.split()
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+class FullTextSearchMixin:
+    """ModelAdmin: поиск по FTS5-таблице fts_table вместо LIKE.
+
+    fts_fields — поля search_fields, покрытые индексом; по остальным
+    (например, author__username) ищет обычный поиск Django, и результаты
+    объединяются.
+    """
+    fts_table = None
+    fts_fields = ('text',)
+
+    def get_search_results(self, request, queryset, search_term):
+        query = fts_query(search_term)
+        if not query or not fts_available(self.fts_table):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        matches = RawSQL(
+            f'SELECT rowid FROM {self.fts_table} '
+            f'WHERE {self.fts_table} MATCH %s',
+            [query],
+        )
+        results = queryset.filter(pk__in=matches)
+        others = [
+            field for field in self.get_search_fields(request)
+            if field not in self.fts_fields
+        ]
+        if not others:
+            return results, False
+        # Копия, а не правка self: экземпляр ModelAdmin общий для потоков.
+        admin = copy.copy(self)
+        admin.get_search_fields = lambda request: others
+        search = super(FullTextSearchMixin, admin).get_search_results
+        found, use_distinct = search(request, queryset, search_term)
+        return results | found, use_distinct
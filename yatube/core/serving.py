@@ -0,0 +1,216 @@
+"""Отдача медиа и статики с кешированием, диапазонами и offload на прокси.
+
+Django отдаёт файлы только в режиме DEBUG. Здесь собрана отдача для
+боевого режима: ETag и If-None-Match, запросы диапазонов (Range),
+годовой кеш для файлов с хешем в имени и передача работы фронтовому
+прокси через X-Accel-Redirect (nginx) или X-Sendfile (Apache, lighttpd).
+Для статики по Accept-Encoding выбирается заранее сжатая копия (.br, .gz),
+которую кладёт collectstatic.
+Без прокси файл уходит через FileResponse: WSGI-серверы с
+wsgi.file_wrapper (gunicorn, uWSGI) отправляют его системным вызовом
+sendfile() без копирования в память процесса, под ASGI то же делает
+core/asgi.py через расширение http.response.zerocopysend.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified,
+)
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+
+# Имена с хешем содержимого: app.3f2a9c1b0d4e.css из ManifestStaticFilesStorage
+# и posts/ab/cd/<sha256>.jpg из ContentAddressedStorage.
+HASHED_NAME_RE = re.compile(
+    r'(\.[0-9a-f]{12}\.[^/.]+|(^|/)[0-9a-f]{64}\.[^/.]+)$'
+)
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=0, must-revalidate'
+# Сжатые копии в порядке предпочтения.
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+
+class RangeFile:
+    """Файл, из которого читается только диапазон [start, start + length).
+
+    fileno() отдаёт дескриптор, уже сдвинутый на начало диапазона, поэтому
+    wsgi.file_wrapper может отправить диапазон через sendfile().
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def make_etag(stat, suffix=''):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{suffix}"'
+
+
+def etag_matches(header, etag):
+    if header.strip() == '*':
+        return True
+    # Для If-None-Match используется слабое сравнение: префикс W/ игнорируем.
+    tags = (tag.strip() for tag in header.split(','))
+    return etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+
+def parse_range(header, size):
+    """Разбирает Range из одного диапазона.
+
+    Возвращает (start, end) включительно, None для неподдерживаемого
+    заголовка (отдаём файл целиком) и False для невыполнимого диапазона.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = int(last)
+        if not length:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def accepted_encodings(header, codings):
+    """Кодировки из codings, которые клиент принимает по Accept-Encoding.
+
+    '*' разрешает кодировки, не названные явно; явный q=0 запрещает
+    кодировку и при '*'.
+    """
+    qualities = {}
+    for item in header.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0
+        if coding:
+            qualities[coding.lower()] = quality
+    default = qualities.get('*', 0)
+    return {
+        coding for coding in codings if qualities.get(coding, default) > 0
+    }
+
+
+def precompressed(request, fullpath):
+    """Ищет сжатую копию файла, которую примет клиент."""
+    accepted = accepted_encodings(
+        request.META.get('HTTP_ACCEPT_ENCODING', ''),
+        [encoding for encoding, _ in PRECOMPRESSED],
+    )
+    for encoding, suffix in PRECOMPRESSED:
+        if encoding in accepted:
+            try:
+                return encoding, suffix, os.stat(fullpath + suffix)
+            except FileNotFoundError:
+                continue
+    return None
+
+
+def cache_headers(response, name, etag, stat):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = (
+        IMMUTABLE if HASHED_NAME_RE.search(name) else REVALIDATE
+    )
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def offload(response, kind, name, fullpath):
+    """Передаёт отдачу файла фронтовому прокси, если это настроено."""
+    mode = settings.FILE_SERVING_OFFLOAD
+    if mode == 'x-accel-redirect':
+        prefix = settings.FILE_SERVING_ACCEL_PREFIXES[kind]
+        response['X-Accel-Redirect'] = prefix + quote(name)
+    elif mode == 'x-sendfile':
+        response['X-Sendfile'] = fullpath
+    else:
+        return False
+    return True
+
+
+def serve(request, path, document_root, kind):
+    """Отдаёт файл path из document_root; kind — 'media' или 'static'."""
+    name = posixpath.normpath(path).lstrip('/')
+    fullpath = safe_join(document_root, name)
+    try:
+        stat = os.stat(fullpath)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404(f'"{name}" не существует')
+    if os.path.isdir(fullpath):
+        raise Http404('Просмотр каталогов запрещён')
+
+    content_type, encoding = mimetypes.guess_type(name)
+    content_type = content_type or 'application/octet-stream'
+    suffix = ''
+    variant = precompressed(request, fullpath) if kind == 'static' else None
+    if variant:
+        encoding, suffix, stat = variant
+
+    etag = make_etag(stat, suffix)
+    response = HttpResponse(content_type=content_type)
+    if etag_matches(request.META.get('HTTP_IF_NONE_MATCH', ''), etag):
+        response = HttpResponseNotModified()
+    elif offload(response, kind, name + suffix, fullpath + suffix):
+        # Диапазоны и отправку файла прокси выполнит сам.
+        pass
+    else:
+        response = file_response(request, fullpath + suffix, stat, etag)
+        response['Content-Type'] = content_type
+    if encoding and response.status_code in (200, 206):
+        response['Content-Encoding'] = encoding
+    if kind == 'static':
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return cache_headers(response, name, etag, stat)
+
+
+def file_response(request, fullpath, stat, etag):
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if 'HTTP_RANGE' in request.META and if_range in (None, etag):
+        byte_range = parse_range(request.META['HTTP_RANGE'], stat.st_size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+
+    start, end = byte_range or (0, stat.st_size - 1)
+    length = end - start + 1
+    response = FileResponse(
+        RangeFile(open(fullpath, 'rb'), start, length),
+        status=206 if byte_range else 200,
+    )
+    response['Content-Length'] = length
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    return response
@@ -0,0 +1,98 @@
+"""Сессии в кеше с отложенной записью в базу (write-behind).
+
+Движок cached_db из Django уже читает сессию из кеша, но каждое
+изменение сразу пишет в базу. Здесь изменения уходят в кеш, а в базу их
+раз в SESSION_WRITE_BEHIND секунд сбрасывает фоновый поток, объединяя
+несколько изменений одной сессии в одно UPDATE. Новые сессии по-прежнему
+создаются в базе сразу: уникальность ключа проверяет база. Сразу пишется
+и первое изменение новой сессии — так вход (при нём ключ сессии меняется)
+не зависит от того, доживёт ли запись в кеше до сброса.
+
+Отложенная запись только обновляет существующую строку, поэтому сессия,
+удалённая при выходе, не воскреснет. Если процесс упадёт, теряются
+изменения не более чем за SESSION_WRITE_BEHIND секунд. Кеш должен быть
+общим для всех воркеров, иначе другой процесс прочитает из базы
+устаревшую сессию (см. проверку core.W001).
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def put(self, model, session_key, session_data, expire_date):
+        with self._lock:
+            self._pending[session_key] = (model, session_data, expire_date)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='session-writer', daemon=True
+                )
+                self._thread.start()
+
+    def discard(self, session_key):
+        with self._lock:
+            self._pending.pop(session_key, None)
+
+    def flush(self):
+        """Записывает накопленные сессии; возвращает их число."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for session_key, (model, data, expire_date) in pending.items():
+            model.objects.filter(session_key=session_key).update(
+                session_data=data, expire_date=expire_date
+            )
+        return len(pending)
+
+    def _run(self):
+        while True:
+            time.sleep(settings.SESSION_WRITE_BEHIND)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Не удалось записать сессии в базу')
+            finally:
+                connection.close()
+
+
+write_behind = WriteBehindQueue()
+
+
+class SessionStore(cached_db.SessionStore):
+    cache_key_prefix = 'core.sessions'
+    created = False
+
+    def create(self):
+        super().create()
+        self.created = True
+
+    def save(self, must_create=False):
+        if (
+            must_create
+            or self.created
+            or self.session_key is None
+            or not settings.SESSION_WRITE_BEHIND
+        ):
+            return super().save(must_create)
+        data = self._get_session()
+        self._cache.set(self.cache_key, data, self.get_expiry_age())
+        write_behind.put(
+            self.model, self.session_key, self.encode(data),
+            self.get_expiry_date(),
+        )
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        if key:
+            write_behind.discard(key)
+        super().delete(session_key)
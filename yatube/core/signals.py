@@ -0,0 +1,12 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .auth import user_cache_key
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def forget_cached_user(sender, instance, **kwargs):
+    cache.delete(user_cache_key(instance.pk))
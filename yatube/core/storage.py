@@ -0,0 +1,211 @@
+import gzip
+import hashlib
+import os
+import re
+import uuid
+from collections import OrderedDict
+
+from django.contrib.staticfiles.storage import (
+    HashedFilesMixin, ManifestStaticFilesStorage,
+)
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+try:
+    import brotli
+except ImportError:  # brotli не обязателен: без него пишем только .gz
+    brotli = None
+
+CSS_TOKEN_RE = re.compile(
+    r'(?P<string>"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')'
+    r'|(?P<comment>/\*(?!!).*?\*/)',
+    re.S,
+)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Файловое хранилище, именующее файлы по хешу содержимого.
+
+    Повторная загрузка тех же байтов не создаёт новый файл, а возвращает
+    имя уже сохранённого. Файлы раскладываются по подкаталогам
+    (``posts/ab/cd/abcd....jpg``), чтобы каталоги не разрастались.
+    Для каждого файла заводится запись ``core.MediaBlob`` со счётчиком
+    ссылок — по нему сборщик мусора находит неиспользуемые файлы.
+    """
+    hash_algorithm = 'sha256'
+
+    def __init__(self, *args, fanout=(2, 2), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fanout = tuple(fanout)
+
+    def get_hashed_name(self, name, content):
+        """Возвращает имя файла, построенное по хешу его содержимого."""
+        hasher = hashlib.new(self.hash_algorithm)
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        digest = hasher.hexdigest()
+        dirname, basename = os.path.split(name)
+        parts = [dirname.replace('\\', '/').strip('/')]
+        start = 0
+        for width in self.fanout:
+            parts.append(digest[start:start + width])
+            start += width
+        parts.append(digest + os.path.splitext(basename)[1].lower())
+        return '/'.join(part for part in parts if part)
+
+    def save(self, name, content, max_length=None):
+        from .models import MediaBlob
+
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.get_hashed_name(name, content)
+        # Запись продлевается до проверки наличия файла: сборка мусора
+        # не трогает недавно продлённые файлы (grace), поэтому найденный
+        # здесь файл не исчезнет до acquire().
+        MediaBlob.objects.touch(name)
+        if not self.exists(name):
+            # Пишем во временный файл и атомарно переименовываем: так
+            # недописанный файл никогда не окажется под «хешевым» именем,
+            # а одновременная загрузка тех же байтов просто перезапишет
+            # идентичное содержимое.
+            temp_name = self._save(f'{name}.{uuid.uuid4().hex}.part', content)
+            os.replace(self.path(temp_name), self.path(name))
+        return name
+
+
+def delete_media(storage, name):
+    """Удаляет файл из хранилища вместе с его миниатюрами sorl-thumbnail.
+
+    Возвращает False, если имя указывает за пределы хранилища.
+    """
+    from sorl.thumbnail import default
+    from sorl.thumbnail.images import ImageFile
+
+    try:
+        storage.path(name)
+    except SuspiciousFileOperation:
+        return False
+    except NotImplementedError:
+        pass
+    default.kvstore.delete(ImageFile(name, storage))
+    storage.delete(name)
+    return True
+
+
+def minify_css(source):
+    """Убирает из CSS комментарии и лишние пробелы, не трогая строки."""
+    strings = []
+
+    def stash(match):
+        # Строки прячем, чтобы правила ниже видели весь CSS, но не
+        # меняли содержимое строк; комментарии выбрасываем.
+        if match.group('string'):
+            strings.append(match.group('string'))
+            return f'\0{len(strings) - 1}\0'
+        return ''
+
+    squeezed = _squeeze_css(CSS_TOKEN_RE.sub(stash, source))
+    return re.sub(
+        r'\0(\d+)\0', lambda match: strings[int(match.group(1))], squeezed
+    ).strip()
+
+
+def _squeeze_css(css):
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    # Пробел перед двоеточием убираем только в объявлениях (за ним идёт
+    # ';' или '}', а не '{'): в селекторе «a :hover» он значим.
+    css = re.sub(r'\s+:(?=[^{};]*[;}])', ':', css)
+    return re.sub(r':\s+', ':', css).replace(';}', '}')
+
+
+def minify_js(source):
+    """Осторожная минификация JS: только пустые строки и строки-комментарии.
+
+    Отступы и переводы строк сохраняются: на переводы опирается
+    автоматическая расстановка точек с запятой, а отступы могут быть
+    частью многострочной строки (продолжение через \\). Файлы с
+    шаблонными строками не трогаем вовсе.
+    """
+    if '`' in source:
+        return source
+    lines = []
+    for line in source.splitlines():
+        stripped = line.strip()
+        if lines and lines[-1].endswith('\\'):
+            # Продолжение строкового литерала — оставляем как есть.
+            lines.append(line)
+        elif stripped and not stripped.startswith('//'):
+            lines.append(line.rstrip())
+    return '\n'.join(lines)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хешем в имени, минификацией и сжатыми копиями.
+
+    collectstatic сначала минифицирует CSS и JS, затем хеширует имена
+    через манифест и рядом с каждым текстовым файлом кладёт .gz и .br,
+    чтобы при отдаче не тратить процессор на сжатие.
+    """
+    minifiers = {'.css': minify_css, '.js': minify_js}
+    compressible = (
+        '.css', '.js', '.svg', '.txt', '.html', '.json', '.xml', '.ico',
+    )
+    # Сжатая копия пишется, только если она заметно меньше исходника.
+    min_ratio = 0.95
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        for path in paths:
+            self.minify(path)
+        # Хешируем уже минифицированные копии из STATIC_ROOT, а не исходники.
+        paths = OrderedDict((path, (self, path)) for path in paths)
+        yield from super().post_process(paths, dry_run, **options)
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            for compressed in self.compress(name):
+                yield name, compressed, True
+
+    def minify(self, path):
+        root, ext = os.path.splitext(path)
+        minifier = self.minifiers.get(ext.lower())
+        if minifier is None or root.endswith('.min'):
+            return
+        with open(self.path(path), encoding='utf-8') as file:
+            source = file.read()
+        minified = minifier(source)
+        if minified != source:
+            with open(self.path(path), 'w', encoding='utf-8') as file:
+                file.write(minified)
+
+    def compress(self, name):
+        if not name.lower().endswith(self.compressible):
+            return
+        with open(self.path(name), 'rb') as file:
+            data = file.read()
+        variants = [('.gz', lambda data: gzip.compress(data, 9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', lambda data: brotli.compress(data)))
+        for suffix, compress in variants:
+            compressed = compress(data)
+            if len(compressed) < len(data) * self.min_ratio:
+                with open(self.path(name + suffix), 'wb') as file:
+                    file.write(compressed)
+                yield name + suffix
+
+    def url(self, name, force=False):
+        try:
+            return super().url(name, force)
+        except ValueError:
+            # Манифеста нет (collectstatic не запускали — разработка,
+            # тесты): отдаём ссылку на файл без хеша.
+            return super(HashedFilesMixin, self).url(name)
+
+
+post_image_storage = ContentAddressedStorage()
@@ -0,0 +1,79 @@
+import logging
+
+from django import template
+from django.conf import settings
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.images import ImageFile
+
+register = template.Library()
+logger = logging.getLogger(__name__)
+
+
+def rendition_widths(display_width, max_width):
+    """Ширины копий картинки для srcset.
+
+    Берём ширины из настроек, но не шире исходника (никакого увеличения)
+    и не больше двукратной ширины показа — этого хватает для HiDPI-экранов.
+    """
+    widths = {
+        width for width in settings.RESPONSIVE_IMAGE_WIDTHS
+        if width < max_width
+    }
+    widths.add(max_width)
+    return sorted(
+        width for width in widths if width <= 2 * display_width
+    ) or [display_width]
+
+
+@register.simple_tag
+def responsive_image(image, geometry, css_class='img-fluid', index=0,
+                     alt=''):
+    """Тег <img> с srcset/sizes, размерами и ленивой загрузкой.
+
+    geometry задаёт рамку показа как в sorl-thumbnail ("500x300"),
+    картинка обрезается по центру под её пропорции. index — номер
+    карточки в ленте: первые RESPONSIVE_IMAGE_EAGER картинок видны сразу
+    и грузятся без loading="lazy".
+    """
+    if not image:
+        return ''
+    try:
+        source = default.kvstore.get_or_set(ImageFile(image))
+        width, height = (int(side) for side in geometry.split('x'))
+        ratio = width / height
+        max_width = int(min(source.width, source.height * ratio))
+        display_width = min(width, max_width)
+        renditions = [
+            get_thumbnail(
+                image,
+                f'{rendition}x{round(rendition / ratio)}',
+                crop='center',
+                upscale=False,
+            )
+            for rendition in rendition_widths(display_width, max_width)
+        ]
+    except Exception:
+        logger.exception('Не удалось подготовить картинку %s', image)
+        return ''
+    fallback = next(
+        (thumb for thumb in renditions if thumb.width >= display_width),
+        renditions[-1],
+    )
+    lazy = index >= settings.RESPONSIVE_IMAGE_EAGER
+    return format_html(
+        '<img class="{}" src="{}" srcset="{}" sizes="{}" width="{}" '
+        'height="{}" alt="{}" decoding="async"{}>',
+        css_class,
+        fallback.url,
+        format_html_join(
+            ', ', '{} {}w',
+            ((thumb.url, thumb.width) for thumb in renditions),
+        ),
+        f'(max-width: {display_width}px) 100vw, {display_width}px',
+        display_width,
+        round(display_width / ratio),
+        alt,
+        mark_safe(' loading="lazy"') if lazy else '',
+    )
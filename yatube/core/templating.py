@@ -0,0 +1,37 @@
+import logging
+import os
+
+from django.conf import settings
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+
+logger = logging.getLogger(__name__)
+
+
+def warm_templates():
+    """Компилирует шаблоны заранее, чтобы первые запросы не ждали.
+
+    Имеет смысл только с кеширующим загрузчиком: иначе скомпилированный
+    шаблон нигде не сохраняется. Возвращает число прогретых шаблонов.
+    """
+    warmed = 0
+    for engine in engines.all():
+        loaders = getattr(engine, 'engine', None)
+        loaders = loaders.template_loaders if loaders else []
+        if not any(isinstance(loader, CachedLoader) for loader in loaders):
+            continue
+        for directory in settings.TEMPLATE_WARMUP_DIRS:
+            for root, _, files in os.walk(directory):
+                for filename in files:
+                    if not filename.endswith('.html'):
+                        continue
+                    name = os.path.relpath(
+                        os.path.join(root, filename), directory
+                    ).replace(os.sep, '/')
+                    try:
+                        engine.get_template(name)
+                    except Exception:
+                        logger.exception('Не удалось прогреть шаблон %s', name)
+                    else:
+                        warmed += 1
+    return warmed
@@ -0,0 +1,108 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.wsgi import get_wsgi_application
+from django.test import SimpleTestCase, override_settings
+
+from ..asgi import ASGIHandler
+from ..events import EventStream, bus
+
+
+def resolve(params, session_key):
+    return ['group:1'] if params.get('feed') == 'group' else None
+
+
+def http_scope(path, query=b''):
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': query,
+        'http_version': '1.1',
+        'headers': [(b'host', b'testserver')],
+    }
+
+
+class ASGIClient:
+    """Отправляет запрос ASGI-приложению и собирает сообщения ответа."""
+
+    def __init__(self):
+        self.incoming = asyncio.Queue()
+        self.sent = []
+        self.body = asyncio.Event()
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def send(self, message):
+        self.sent.append(message)
+        if message.get('body'):
+            self.body.set()
+
+    async def next_body(self):
+        await asyncio.wait_for(self.body.wait(), 1)
+        self.body.clear()
+        return self.sent[-1]['body'].decode()
+
+
+@override_settings(EVENTS_HEARTBEAT=0.05, EVENTS_RETRY=3)
+class EventStreamTests(SimpleTestCase):
+    def test_new_posts_are_coalesced(self):
+        """Несколько постов подряд приходят одним событием с их числом."""
+        async def scenario():
+            client = ASGIClient()
+            task = asyncio.ensure_future(EventStream(resolve)(
+                http_scope('/events/', b'feed=group'),
+                client.receive, client.send,
+            ))
+            self.assertEqual(await client.next_body(), 'retry: 3000\n\n')
+            self.assertEqual(len(bus), 1)
+            bus.publish(['all', 'author:1', 'group:1'])
+            bus.publish(['all', 'author:2', 'group:1'])
+            bus.publish(['all', 'group:2'])
+            event = await client.next_body()
+            while event.startswith(':'):
+                event = await client.next_body()
+            self.assertEqual(
+                event, f'event: posts\ndata: {json.dumps({"new": 2})}\n\n'
+            )
+            self.assertEqual(await client.next_body(), ': ping\n\n')
+            await client.incoming.put({'type': 'http.disconnect'})
+            await asyncio.wait_for(task, 1)
+            self.assertEqual(len(bus), 0)
+            self.assertEqual(client.sent[0]['status'], 200)
+
+        asyncio.run(scenario())
+
+    def test_unknown_feed(self):
+        async def scenario():
+            client = ASGIClient()
+            await EventStream(resolve)(
+                http_scope('/events/', b'feed=nope'),
+                client.receive, client.send,
+            )
+            return client.sent[0]['status']
+
+        self.assertEqual(asyncio.run(scenario()), 404)
+
+    def test_django_views_through_wsgi(self):
+        """Остальные запросы обслуживает Django в пуле потоков."""
+        async def scenario():
+            client = ASGIClient()
+            await client.incoming.put({'type': 'http.request'})
+            with ThreadPoolExecutor(1) as executor:
+                handler = ASGIHandler(
+                    get_wsgi_application(), executor,
+                    routes=(('/events/', EventStream(resolve)),),
+                )
+                await handler(
+                    http_scope('/about/tech/'), client.receive, client.send
+                )
+            return client.sent
+
+        start, body = asyncio.run(scenario())
+        self.assertEqual(start['status'], 200)
+        headers = dict(start['headers'])
+        self.assertTrue(headers[b'content-type'].startswith(b'text/html'))
+        self.assertTrue(body['body'])
@@ -0,0 +1,85 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import metrics
+from ..hashing import HashingBusy, HashingPool, _make
+
+User = get_user_model()
+
+
+def _crash(submitted):
+    os._exit(1)
+
+
+class OffloadedHashingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='hasher', password='Секретный-пароль-1'
+        )
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+
+    def login(self, password='Секретный-пароль-1'):
+        return self.client.post(reverse('users:login'), {
+            'username': 'hasher', 'password': password,
+        })
+
+    def test_login_in_process_pool(self):
+        """Пароль проверяется в пуле, время попадает в метрики."""
+        self.assertRedirects(self.login(), reverse('posts:index'))
+        self.assertEqual(self.login('неверный').status_code, 200)
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['password_hashing.calls']['check'], 2)
+        self.assertGreater(snapshot['password_hashing.hash_ms']['check'], 0)
+
+    @override_settings(PASSWORD_HASHING_WORKERS=0)
+    def test_outdated_hash_is_upgraded(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password(
+            'Секретный-пароль-1', hasher='pbkdf2_sha1'
+        ))
+        self.login()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+    @override_settings(PASSWORD_HASHING_QUEUE=0)
+    def test_full_queue_returns_503(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+        response = self.client.post(reverse('admin:login'), {
+            'username': 'hasher', 'password': 'Секретный-пароль-1',
+        })
+        self.assertEqual(response.status_code, 503)
+
+    @override_settings(PASSWORD_HASHING_WORKERS=0)
+    def test_signup_hashes_password(self):
+        self.client.post(reverse('users:signup'), {
+            'username': 'newbie',
+            'password1': 'Другой-пароль-2',
+            'password2': 'Другой-пароль-2',
+        })
+        self.assertTrue(
+            User.objects.get(username='newbie').check_password(
+                'Другой-пароль-2')
+        )
+
+    def test_broken_pool_is_recreated(self):
+        """Упавший процесс пула даёт HashingBusy, а не ломает пул."""
+        pool = HashingPool()
+        with self.assertRaises(HashingBusy):
+            pool.run(_crash)
+        self.assertIsNone(pool._executor)
+        encoded, _, _ = pool.run(_make, 'Пароль-3')
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$'))
+        pool._executor.shutdown()
+        self.assertEqual(metrics.snapshot()['password_hashing.broken'], {
+            '_crash': 1,
+        })
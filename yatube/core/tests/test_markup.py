@@ -0,0 +1,38 @@
+from django.test import SimpleTestCase
+
+from ..markup import preview, render
+
+
+class MarkupTests(SimpleTestCase):
+    def test_render(self):
+        cases = {
+            '**жирный** и *курсив*': (
+                '<p><strong>жирный</strong> и <em>курсив</em></p>'
+            ),
+            'строка\nстрока\n\nабзац': (
+                '<p>строка<br>\nстрока</p>\n<p>абзац</p>'
+            ),
+            '`<b>` 2*3*4': '<p><code>&lt;b&gt;</code> 2*3*4</p>',
+            'см. https://example.com/?a=1&b=2.': (
+                '<p>см. <a href="https://example.com/?a=1&amp;b=2" '
+                'rel="nofollow ugc">https://example.com/?a=1&amp;b=2</a>.</p>'
+            ),
+            '[**сайт**](https://example.com)': (
+                '<p><a href="https://example.com" rel="nofollow ugc">'
+                '<strong>сайт</strong></a></p>'
+            ),
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(render(text), expected)
+
+    def test_html_is_escaped(self):
+        """Разметка пользователя не попадает в HTML как есть."""
+        html = render('<script>alert(1)</script> [x](javascript:alert(1))')
+        self.assertNotIn('<script>', html)
+        self.assertNotIn('href="javascript', html)
+
+    def test_preview(self):
+        text = '**Начало**   поста\n\nс [ссылкой](https://example.com)'
+        self.assertEqual(preview(text, 100), 'Начало поста с ссылкой')
+        self.assertEqual(preview(text, 10), 'Начало по…')
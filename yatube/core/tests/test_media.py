@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from django.test import TransactionTestCase, override_settings
+
+from posts.models import Post
+from ..management.commands.collect_media import Command
+from ..models import MediaBlob
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00'
+    b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+    b'\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class CollectMediaTests(TransactionTestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.post = Post.objects.create(
+            text='Пост с картинкой',
+            author=self.author,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif'),
+        )
+        self.orphan = os.path.join(TEMP_MEDIA_ROOT, 'posts', 'orphan.gif')
+        with open(self.orphan, 'wb') as orphan:
+            orphan.write(SMALL_GIF)
+
+    def tearDown(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def collect(self, *args):
+        out = StringIO()
+        call_command('collect_media', '--grace=0', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_keeps_files(self):
+        """Пробный запуск только перечисляет ненужные файлы."""
+        output = self.collect('--dry-run')
+        self.assertIn('posts/orphan.gif', output)
+        self.assertNotIn(self.post.image.name, output)
+        self.assertTrue(os.path.exists(self.orphan))
+
+    def test_orphans_are_deleted(self):
+        """Удаляются только файлы, на которые нет ссылок."""
+        self.collect()
+        self.assertFalse(os.path.exists(self.orphan))
+        self.assertTrue(os.path.exists(self.post.image.path))
+
+    def test_deleting_post_removes_image(self):
+        """Картинка удалённого поста удаляется сборкой после срока grace."""
+        path = self.post.image.path
+        self.post.delete()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(MediaBlob.objects.get().refcount, 0)
+        self.collect()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_fresh_unreferenced_blob_is_kept(self):
+        """Только что освобождённый файл не удаляется: его могут
+        переиспользовать загрузкой тех же байтов."""
+        name = self.post.image.name
+        self.post.delete()
+        storage = Post._meta.get_field('image').storage
+        self.assertFalse(MediaBlob.objects.collect_one(name, [storage]))
+        self.assertTrue(storage.exists(name))
+
+    def test_reuploaded_orphan_is_kept(self):
+        """Файл, загруженный заново после проверки, не удаляется."""
+        name = self.post.image.name
+        self.post.delete()
+        MediaBlob.objects.update(updated=timezone.now() - timedelta(days=1))
+        command = Command()
+        command.fields = []
+        command.grace = timedelta(hours=1)
+        command.storages = [Post._meta.get_field('image').storage]
+        self.assertEqual(command.orphan_originals([name]), [name])
+        MediaBlob.objects.touch(name)
+        self.assertFalse(command.delete_original(name))
+        self.assertTrue(command.storages[0].exists(name))
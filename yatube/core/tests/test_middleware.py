@@ -0,0 +1,70 @@
+import gzip
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from posts.models import Post
+from .. import metrics
+from ..middleware import minify_html
+
+User = get_user_model()
+
+
+class MinifyHtmlTests(TestCase):
+    def test_whitespace_is_collapsed(self):
+        """Отступы схлопываются, содержимое <pre> и <textarea> — нет."""
+        html = (
+            '<ul>\n    <li>  a  </li>\n\n    <li>b</li>\n</ul>\n'
+            '<pre>  x\n    y</pre>\n  <textarea>\n  z  </textarea>'
+        )
+        self.assertEqual(
+            minify_html(html),
+            '<ul>\n<li> a </li>\n<li>b</li>\n</ul>\n'
+            '<pre>  x\n    y</pre>\n<textarea>\n  z  </textarea>',
+        )
+
+    def test_attribute_values_are_kept(self):
+        """Пробелы в значениях атрибутов видны пользователю — их не трогаем."""
+        html = (
+            '<input  value="a   b"\n       title=\'x\n  y\'>  '
+            '<b data-x="1 > 0   !">  c  </b>'
+        )
+        self.assertEqual(
+            minify_html(html),
+            '<input value="a   b"\ntitle=\'x\n  y\'> '
+            '<b data-x="1 > 0   !"> c </b>',
+        )
+
+
+class CompressionMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.posts = Post.objects.bulk_create(
+            Post(text=f'Пост номер {i}', author=cls.user) for i in range(10)
+        )
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+
+    def test_index_is_minified_and_compressed(self):
+        response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        html = gzip.decompress(response.content).decode()
+        self.assertIn('Пост номер 9', html)
+        self.assertNotIn('\n  ', html)
+        saved = metrics.snapshot()
+        self.assertGreater(saved['html_minify.bytes_saved']['posts:index'], 0)
+        self.assertGreater(saved['compression.bytes_saved']['posts:index'], 0)
+
+    def test_pages_with_csrf_token_are_not_compressed(self):
+        """Страница с формой и CSRF-токеном не сжимается (BREACH)."""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get('/create/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('csrfmiddlewaretoken', response.content.decode())
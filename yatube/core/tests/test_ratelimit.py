@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+from ..ratelimit import consume, parse_rate, ratelimit, take
+
+User = get_user_model()
+
+
+class TokenBucketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('10/m'), (10, 60))
+        self.assertEqual(parse_rate('100/5m'), (100, 300))
+        with self.assertRaises(ValueError):
+            parse_rate('10 в минуту')
+
+    def test_bucket_refills_over_time(self):
+        """Пустое ведро снова даёт токен через period / count секунд."""
+        for _ in range(3):
+            self.assertEqual(consume('bucket', '3/m', now=100), 0)
+        self.assertAlmostEqual(consume('bucket', '3/m', now=100), 20)
+        self.assertAlmostEqual(consume('bucket', '3/m', now=110), 10)
+        self.assertEqual(consume('bucket', '3/m', now=120), 0)
+
+    def test_rejected_request_keeps_other_tokens(self):
+        """Отказ по одному ведру не тратит токены других."""
+        buckets = {'user': '3/m', 'ip': '1/m'}
+        self.assertEqual(take(buckets, now=100), 0)
+        for _ in range(3):
+            self.assertAlmostEqual(take(buckets, now=100), 60)
+        self.assertEqual(consume('user', '3/m', now=100), 0)
+        self.assertEqual(consume('user', '3/m', now=100), 0)
+        self.assertAlmostEqual(consume('user', '3/m', now=100), 20)
+
+    def test_busy_lock_rejects(self):
+        """Параллельный запрос держит замок ведра — запрос отклоняется."""
+        key = 'ratelimit:view:ip:127.0.0.1'
+        cache.add(f'{key}:lock', 1, 1)
+        for _ in range(5):
+            self.assertGreater(consume(key, '1/m', now=100), 0)
+        cache.delete(f'{key}:lock')
+        self.assertEqual(consume(key, '1/m', now=100), 0)
+
+    def test_decorator(self):
+        view = ratelimit({'ip': '1/m'})(lambda request: HttpResponse())
+        factory = RequestFactory()
+        self.assertEqual(view(factory.post('/')).status_code, 200)
+        self.assertEqual(view(factory.get('/')).status_code, 200)
+        self.assertEqual(view(factory.post('/')).status_code, 429)
+
+
+@override_settings(RATELIMITS={
+    'posts:add_comment': {'rates': {'user': '2/m', 'ip': '100/m'}},
+})
+class RateLimitMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='spammer')
+        cls.post = Post.objects.create(text='Пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_write_is_throttled_per_user(self):
+        """Третий комментарий за минуту получает 429 и Retry-After."""
+        url = reverse('posts:add_comment', args=(self.post.pk,))
+        for _ in range(2):
+            response = self.client.post(url, {'text': 'Спам'})
+            self.assertEqual(response.status_code, 302)
+        response = self.client.post(url, {'text': 'Спам'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(self.post.comments.count(), 2)
+        other = User.objects.create_user(username='other')
+        self.client.force_login(other)
+        response = self.client.post(url, {'text': 'Не спам'})
+        self.assertEqual(response.status_code, 302)
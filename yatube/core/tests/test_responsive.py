@@ -0,0 +1,73 @@
+import re
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from posts.models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_file(size):
+    buffer = BytesIO()
+    Image.new('RGB', size, (255, 0, 0)).save(buffer, 'PNG')
+    return SimpleUploadedFile('image.png', buffer.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ResponsiveImageTests(TestCase):
+    template = Template(
+        '{% load responsive %}'
+        '{% responsive_image post.image geometry index=index %}'
+    )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+
+    def render(self, size, geometry='500x300', index=0):
+        post = Post.objects.create(
+            text='Пост', author=self.author, image=image_file(size)
+        )
+        return self.template.render(Context(
+            {'post': post, 'geometry': geometry, 'index': index}
+        ))
+
+    def test_srcset_and_dimensions(self):
+        """Тег отдаёт srcset, sizes и размеры рамки показа."""
+        html = self.render((1600, 1200))
+        widths = [int(w) for w in re.findall(r' (\d+)w', html)]
+        self.assertEqual(widths, [320, 640, 960])
+        self.assertIn('width="500" height="300"', html)
+        self.assertIn('sizes="(max-width: 500px) 100vw, 500px"', html)
+        self.assertNotIn('loading="lazy"', html)
+
+    def test_small_image_is_not_upscaled(self):
+        """Маленькая картинка не растягивается."""
+        html = self.render((200, 120))
+        widths = [int(w) for w in re.findall(r' (\d+)w', html)]
+        self.assertEqual(widths, [200])
+        self.assertIn('width="200" height="120"', html)
+
+    def test_below_the_fold_is_lazy(self):
+        """Картинки ниже первого экрана грузятся лениво."""
+        self.assertIn('loading="lazy"', self.render((600, 600), index=3))
+
+    def test_missing_image_renders_nothing(self):
+        post = Post.objects.create(text='Без картинки', author=self.author)
+        html = self.template.render(Context(
+            {'post': post, 'geometry': '500x300', 'index': 0}
+        ))
+        self.assertEqual(html, '')
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..asgi import ZEROCOPY, ASGIHandler
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+HASHED = 'posts/ab/cd/' + 'abcd' * 16 + '.txt'
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ServeMediaTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in ('plain.txt', HASHED):
+            path = os.path.join(TEMP_MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(b'0123456789')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def get(self, name, **headers):
+        response = self.client.get(settings.MEDIA_URL + name, **headers)
+        if response.streaming:
+            response.body = b''.join(response.streaming_content)
+        return response
+
+    def test_full_file_and_etag(self):
+        """Файл отдаётся целиком, повторный запрос с ETag получает 304."""
+        response = self.get('plain.txt')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.body, b'0123456789')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('must-revalidate', response['Cache-Control'])
+        repeated = self.get(
+            'plain.txt', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(repeated.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_hashed_name_is_immutable(self):
+        response = self.get(HASHED)
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_byte_ranges(self):
+        """Поддерживаются обычные и суффиксные диапазоны."""
+        cases = {
+            'bytes=2-4': (b'234', 'bytes 2-4/10'),
+            'bytes=7-': (b'789', 'bytes 7-9/10'),
+            'bytes=-2': (b'89', 'bytes 8-9/10'),
+        }
+        for header, (body, content_range) in cases.items():
+            with self.subTest(header=header):
+                response = self.get('plain.txt', HTTP_RANGE=header)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.PARTIAL_CONTENT
+                )
+                self.assertEqual(response.body, body)
+                self.assertEqual(response['Content-Range'], content_range)
+                self.assertEqual(response['Content-Length'], str(len(body)))
+
+    def test_unsatisfiable_range(self):
+        response = self.get('plain.txt', HTTP_RANGE='bytes=20-30')
+        self.assertEqual(
+            response.status_code, HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    @override_settings(FILE_SERVING_OFFLOAD='x-accel-redirect')
+    def test_accel_redirect(self):
+        """При offload файл отдаёт nginx, тело ответа пустое."""
+        response = self.get('plain.txt')
+        self.assertEqual(
+            response['X-Accel-Redirect'], '/protected/media/plain.txt'
+        )
+        self.assertEqual(response.content, b'')
+
+    def test_missing_file(self):
+        response = self.get('missing.txt')
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+ASGI_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=ASGI_MEDIA_ROOT)
+class ASGIFileTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(os.path.join(ASGI_MEDIA_ROOT, 'plain.txt'), 'wb') as file:
+            file.write(b'0123456789')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(ASGI_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def request(self, extensions, headers=()):
+        sent = []
+
+        async def receive():
+            return {'type': 'http.request'}
+
+        async def send(message):
+            if message['type'] == ZEROCOPY:
+                # Так поступил бы сервер: os.sendfile() с позиции файла.
+                message = dict(message, body=os.read(
+                    message['file'].fileno(), message['count']
+                ))
+            sent.append(message)
+
+        async def scenario():
+            with ThreadPoolExecutor(1) as executor:
+                await ASGIHandler(get_wsgi_application(), executor)({
+                    'type': 'http',
+                    'method': 'GET',
+                    'path': settings.MEDIA_URL + 'plain.txt',
+                    'query_string': b'',
+                    'http_version': '1.1',
+                    'headers': [(b'host', b'testserver'), *headers],
+                    'extensions': extensions,
+                }, receive, send)
+
+        asyncio.run(scenario())
+        return sent
+
+    def test_zerocopy_send(self):
+        """Диапазон уходит сообщением zerocopysend, а не в памяти."""
+        start, body = self.request(
+            {ZEROCOPY: {}}, [(b'range', b'bytes=2-4')]
+        )
+        self.assertEqual(start['status'], HTTPStatus.PARTIAL_CONTENT)
+        self.assertEqual(body['type'], ZEROCOPY)
+        self.assertEqual(body['body'], b'234')
+
+    def test_file_is_streamed_without_extension(self):
+        start, *chunks = self.request({})
+        self.assertEqual(start['status'], HTTPStatus.OK)
+        self.assertEqual(
+            b''.join(chunk['body'] for chunk in chunks), b'0123456789'
+        )
+        self.assertFalse(chunks[-1]['more_body'])
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..sessions import SessionStore, write_behind
+
+User = get_user_model()
+
+
+# В тестах один процесс, так что кеш пользователя и отложенная запись
+# сессий включаются и с LocMemCache.
+@override_settings(USER_CACHE_TIMEOUT=300, SESSION_WRITE_BEHIND=10)
+class CachedSessionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='cached')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_authenticated_request_without_queries(self):
+        """Сессия и пользователь берутся из кеша, а не из базы."""
+        url = reverse('about:author')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_password_change_drops_cached_user(self):
+        url = reverse('about:author')
+        self.client.get(url)
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('new-password')
+        user.save()
+        response = self.client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_write_behind(self):
+        """Изменения сессии попадают в базу при сбросе очереди."""
+        session = SessionStore(self.client.session.session_key)
+        session['theme'] = 'dark'
+        session.save()
+        row = Session.objects.get(session_key=session.session_key)
+        self.assertNotIn('theme', row.get_decoded())
+        write_behind.flush()
+        row.refresh_from_db()
+        self.assertEqual(row.get_decoded()['theme'], 'dark')
+
+    def test_deleted_session_is_not_written_back(self):
+        session = SessionStore(self.client.session.session_key)
+        session['theme'] = 'dark'
+        session.save()
+        session.delete()
+        write_behind.flush()
+        self.assertFalse(
+            Session.objects.filter(session_key=session.session_key).exists()
+        )
+
+    @override_settings(USER_CACHE_TIMEOUT=0, SESSION_WRITE_BEHIND=0)
+    def test_process_local_cache_disables_caching(self):
+        """С выключенным кешем пользователь читается из базы."""
+        url = reverse('about:author')
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            self.client.get(url)
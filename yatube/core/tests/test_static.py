@@ -0,0 +1,102 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..storage import minify_css, minify_js
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+TEMP_STATIC_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CSS = '''/* заголовок */
+body  {
+  color : red ;
+  content: "a  /* b */  c";
+}
+'''
+
+
+@override_settings(
+    STATIC_ROOT=TEMP_STATIC_ROOT,
+    STATICFILES_DIRS=[TEMP_STATIC_DIR],
+    INSTALLED_APPS=[
+        'core.apps.CoreConfig',
+        'django.contrib.staticfiles',
+    ],
+)
+class CollectStaticTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(os.path.join(TEMP_STATIC_DIR, 'site.css'), 'w') as file:
+            file.write(CSS * 20)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+        shutil.rmtree(TEMP_STATIC_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_minify_css(self):
+        """Комментарии и пробелы убираются, строки остаются как есть."""
+        self.assertEqual(
+            minify_css(CSS), 'body{color:red;content:"a  /* b */  c"}'
+        )
+        self.assertEqual(minify_css('a :hover , b{ }'), 'a :hover,b{}')
+
+    def test_minify_js(self):
+        """Удаляются пустые строки и комментарии, отступы остаются."""
+        source = (
+            'function f() {\n'
+            '    // комментарий\n'
+            '\n'
+            "    var s = 'a \\\n"
+            "    // не комментарий';\n"
+            '    return s;\n'
+            '}\n'
+        )
+        self.assertEqual(minify_js(source), (
+            'function f() {\n'
+            "    var s = 'a \\\n"
+            "    // не комментарий';\n"
+            '    return s;\n'
+            '}'
+        ))
+
+    def test_hashed_and_precompressed(self):
+        """В STATIC_ROOT лежат файл с хешем и его сжатая копия."""
+        name = staticfiles_storage.stored_name('site.css')
+        self.assertRegex(name, r'^site\.[0-9a-f]{12}\.css$')
+        with open(os.path.join(TEMP_STATIC_ROOT, name + '.gz'), 'rb') as gz:
+            self.assertEqual(
+                gzip.decompress(gz.read()).decode(),
+                minify_css(CSS * 20),
+            )
+
+    def test_precompressed_variant_is_served(self):
+        """Клиенту с gzip отдаётся сжатая копия с годовым кешем."""
+        url = staticfiles_storage.url('site.css')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(body).decode(), minify_css(CSS * 20))
+        plain = self.client.get(url, HTTP_ACCEPT_ENCODING='identity')
+        self.assertFalse(plain.has_header('Content-Encoding'))
+
+    def test_explicit_refusal_beats_wildcard(self):
+        """'*' не возвращает кодировки, от которых клиент отказался."""
+        url = staticfiles_storage.url('site.css')
+        response = self.client.get(
+            url, HTTP_ACCEPT_ENCODING='*, br;q=0, gzip;q=0'
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='*;q=0.5, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
@@ -1,4 +1,12 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.views.decorators.http import require_safe
+
+from . import metrics as metrics_registry
+from . import serving
+from .models import Job
 
 
 def page_not_found(request, exception):
@@ -17,3 +25,31 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+@require_safe
+def serve_media(request, path):
+    return serving.serve(request, path, settings.MEDIA_ROOT, 'media')
+
+
+@require_safe
+def serve_static(request, path):
+    return serving.serve(request, path, settings.STATIC_ROOT, 'static')
+
+
+@staff_member_required
+def metrics(request):
+    return JsonResponse(metrics_registry.snapshot())
+
+
+@staff_member_required
+def job_progress(request, pk):
+    job = get_object_or_404(Job, pk=pk)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'status': job.status,
+            'done': job.done,
+            'total': job.total,
+            'percent': job.percent,
+        })
+    return render(request, 'core/job.html', {'job': job})
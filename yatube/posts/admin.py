@@ -1,9 +1,108 @@
+from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.db.models import CharField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Concat
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
 
-from .models import Post, Group, Comment
+from core import jobs
 
+from core.paginator import EstimatedCountPaginator
+from core.search import FullTextSearchMixin
+from .bulk import dump_selection
+from .models import Post, Group, Comment, PostCounter
+from .purge import soft_delete_post
 
-class PostAdmin(admin.ModelAdmin):
+
+class SoftDeleteMixin:
+    """Удаление из админки — мягкое, с очисткой в фоне (posts/purge.py).
+
+    Страница подтверждения не собирает все связанные объекты: именно это
+    и загружает в память всё, что накопил объект.
+    """
+    soft_delete = None
+
+    def get_deleted_objects(self, objs, request):
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        self.soft_delete(obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.soft_delete(obj)
+
+
+class MoveToGroupForm(forms.Form):
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        required=False,
+        label='Группа',
+        empty_label='— без группы —',
+    )
+
+
+class BulkActionsMixin:
+    """Массовые действия через фоновое задание (posts/bulk.py).
+
+    Вместо стандартного delete_selected, который грузит все объекты
+    ради страницы подтверждения и удаляет их одним запросом. Список
+    объектов на странице подтверждения показывается, только если их не
+    больше BULK_ACTION_LIST_LIMIT, иначе — только число.
+    """
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def run_bulk_action(self, request, queryset, kind, title,
+                        form_class=forms.Form, params=None):
+        form = form_class(request.POST if 'confirm' in request.POST else None)
+        if form.is_valid():
+            job = jobs.enqueue(kind, params={
+                **dump_selection(request, queryset),
+                **(params or {}),
+                **{
+                    name: getattr(value, 'pk', value)
+                    for name, value in form.cleaned_data.items()
+                },
+            })
+            self.message_user(request, f'{title}: задание {job.pk} начато.')
+            return redirect('job_progress', job.pk)
+        count = queryset.count()
+        limit = settings.BULK_ACTION_LIST_LIMIT
+        context = {
+            **self.admin_site.each_context(request),
+            'title': title,
+            'opts': self.model._meta,
+            'form': form,
+            'count': count,
+            'objects': queryset[:limit] if count <= limit else None,
+            'action': request.POST['action'],
+            'selected': request.POST.getlist(ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(
+            request, 'admin/posts/bulk_action.html', context
+        )
+
+
+class LargeTableAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    """Настройки списка для таблиц на миллионы строк.
+
+    Число строк приблизительное и без второго COUNT(*) по всей таблице,
+    поиск идёт по полнотекстовому индексу, связи выбираются JOIN-ом.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    empty_value_display = '-пусто-'
+
+
+class PostAdmin(SoftDeleteMixin, BulkActionsMixin, LargeTableAdmin):
     list_display = (
         'pk',
         'text',
@@ -12,18 +111,104 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
-    list_filter = ('pub_date',)
-    empty_value_display = '-пусто-'
+    fts_table = 'posts_post_fts'
+    list_filter = ('pub_date', 'is_deleted')
+    date_hierarchy = 'pub_date'
+    soft_delete = staticmethod(soft_delete_post)
+    actions = ('move_to_group', 'delete_posts', 'purge_post_comments')
 
+    def move_to_group(self, request, queryset):
+        return self.run_bulk_action(
+            request, queryset, 'posts.bulk_move', 'Перенос в группу',
+            form_class=MoveToGroupForm,
+        )
 
-class CommentAdmin(admin.ModelAdmin):
+    move_to_group.short_description = 'Перенести в группу'
+    move_to_group.allowed_permissions = ('change',)
+
+    def delete_posts(self, request, queryset):
+        return self.run_bulk_action(
+            request, queryset, 'posts.bulk_delete', 'Удаление постов'
+        )
+
+    delete_posts.short_description = 'Удалить выбранные посты'
+    delete_posts.allowed_permissions = ('delete',)
+
+    def purge_post_comments(self, request, queryset):
+        return self.run_bulk_action(
+            request, queryset, 'posts.purge_comments',
+            'Удаление комментариев', params={'of_posts': True},
+        )
+
+    purge_post_comments.short_description = 'Удалить комментарии постов'
+    purge_post_comments.allowed_permissions = ('delete',)
+
+    def get_changelist_form(self, request, **kwargs):
+        # Выбор группы в каждой строке списка: один запрос за группами
+        # на всю страницу, а не по запросу на строку.
+        form = super().get_changelist_form(request, **kwargs)
+        choices = [('', '---------')]
+        choices += Group.objects.values_list('pk', 'title')
+
+        class ChangeListForm(form):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.fields['group'].widget = forms.Select(choices=choices)
+
+        return ChangeListForm
+
+
+class CommentAdmin(BulkActionsMixin, LargeTableAdmin):
     list_display = ('pk', 'text', 'author', 'created')
-    search_fields = ('text', 'author')
+    list_select_related = ('author',)
+    raw_id_fields = ('post',)
+    autocomplete_fields = ('author',)
+    search_fields = ('text', 'author__username')
+    fts_table = 'posts_comment_fts'
     list_filter = ('created',)
-    empty_value_display = '-пусто-'
+    date_hierarchy = 'created'
+    actions = ('delete_comments',)
+
+    def delete_comments(self, request, queryset):
+        return self.run_bulk_action(
+            request, queryset, 'posts.purge_comments',
+            'Удаление комментариев',
+        )
+
+    delete_comments.short_description = 'Удалить выбранные комментарии'
+    delete_comments.allowed_permissions = ('delete',)
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug', 'posts_count')
+    search_fields = ('title',)
+
+    def get_queryset(self, request):
+        # Число постов берём из счётчиков, а не COUNT(*) по каждой группе.
+        scope = Concat(Value('group:'), Cast('pk', CharField()))
+        counter = PostCounter.objects.filter(scope=OuterRef('scope'))
+        return super().get_queryset(request).annotate(
+            scope=scope,
+            posts_count=Subquery(counter.values('count')[:1]),
+        )
+
+    def posts_count(self, obj):
+        return obj.posts_count
+
+    posts_count.short_description = 'Число постов'
+    posts_count.admin_order_field = 'posts_count'
+
+
+class PostCounterAdmin(admin.ModelAdmin):
+    list_display = ('scope', 'count')
+    search_fields = ('scope',)
+    readonly_fields = ('scope', 'count')
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(PostCounter, PostCounterAdmin)
 admin.site.register(Comment, CommentAdmin)
@@ -0,0 +1,146 @@
+"""Массовые действия админки, выполняемые фоновым заданием пачками.
+
+Действие в админке только ставит задание (core/jobs.py) с описанием
+выборки в JSON: отмеченные pk (их не больше страницы списка) или, при
+«выбрать все», параметры списка — фильтры и поиск, а не все pk таблицы.
+Обработчик ниже заново строит по ним выборку через ChangeList админки
+и проходит её пачками по PURGE_BATCH_SIZE с курсором по pk: каждая
+пачка — короткая транзакция с массовыми UPDATE/DELETE без загрузки
+объектов. Сигналы при этом не срабатывают, поэтому счётчики лент и
+сводки групп поправляются здесь же.
+"""
+from django.apps import apps
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.auth import get_user_model
+from django.http import HttpRequest, QueryDict
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from core import jobs
+from .events import reset_heads
+from .models import Comment, GroupStats, Post, PostCounter
+from .purge import batches, purge_posts, raw_delete
+
+
+def dump_selection(request, queryset):
+    """Параметры задания, описывающие выборку действия админки.
+
+    Строки выборки «выбрать все» не читаются; граница по pk — один шаг
+    по индексу — не даёт заданию захватить объекты, созданные после
+    подтверждения.
+    """
+    model = queryset.model
+    if request.POST.get('select_across') != '1':
+        return {
+            'model': model._meta.label_lower,
+            'pks': list(queryset.values_list('pk', flat=True)),
+        }
+    filters = request.GET.copy()
+    filters.pop(PAGE_VAR, None)
+    last = model._base_manager.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first()
+    return {
+        'model': model._meta.label_lower,
+        'filters': filters.urlencode(),
+        'user': request.user.pk,
+        'last_pk': last or 0,
+    }
+
+
+def selection(job):
+    """Выборка задания: по pk или заново через ChangeList админки."""
+    params = job.params
+    model = apps.get_model(params['model'])
+    if 'pks' in params:
+        return model._base_manager.filter(pk__in=params['pks'])
+    request = HttpRequest()
+    request.method = 'GET'
+    request.GET = QueryDict(params['filters'])
+    request.user = get_user_model()._default_manager.get(pk=params['user'])
+    model_admin = admin.site._registry[model]
+    changelist = model_admin.get_changelist_instance(request)
+    return changelist.queryset.filter(pk__lte=params['last_pk'])
+
+
+def chunks(queryset, size):
+    """Отдаёт pk выборки пачками по возрастанию, продолжая с последнего.
+
+    Выборка не должна терять строки из-за обработки: обработанные
+    строки остаются позади курсора, и OFFSET не нужен.
+    """
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    last = 0
+    while True:
+        chunk = list(pks.filter(pk__gt=last)[:size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+
+
+def _start(job):
+    queryset = selection(job)
+    job.set_total(queryset.count())
+    return chunks(queryset, settings.PURGE_BATCH_SIZE)
+
+
+def _visible_counts(pks, *fields):
+    return (
+        Post.objects.visible().filter(pk__in=pks).order_by()
+        .values_list(*fields).annotate(total=Count('pk'))
+    )
+
+
+@jobs.register('posts.bulk_move')
+def bulk_move(job):
+    group_id = job.params['group']
+    groups = {group_id}
+    for chunk in _start(job):
+        with transaction.atomic():
+            moved = 0
+            for old_group, total in _visible_counts(chunk, 'group_id'):
+                if old_group == group_id:
+                    continue
+                groups.add(old_group)
+                moved += total
+                PostCounter.objects.bump([f'group:{old_group}'], -total)
+            if group_id:
+                PostCounter.objects.bump([f'group:{group_id}'], moved)
+            # updated меняется, чтобы сменился ключ кеша карточки.
+            Post.objects.filter(pk__in=chunk).update(
+                group_id=group_id, updated=timezone.now()
+            )
+        job.progress(len(chunk))
+    GroupStats.objects.refresh(groups)
+    reset_heads([f'group:{pk}' for pk in groups if pk])
+
+
+@jobs.register('posts.bulk_delete')
+def bulk_delete(job):
+    for chunk in _start(job):
+        with transaction.atomic():
+            rows = _visible_counts(chunk, 'author_id', 'group_id')
+            for author_id, group_id, total in rows:
+                scopes = ['all', f'author:{author_id}']
+                if group_id:
+                    scopes.append(f'group:{group_id}')
+                PostCounter.objects.bump(scopes, -total)
+            Post.objects.filter(pk__in=chunk).update(is_deleted=True)
+        purge_posts(job, Post.objects.filter(pk__in=chunk),
+                    settings.PURGE_BATCH_SIZE)
+
+
+@jobs.register('posts.purge_comments')
+def purge_comments(job):
+    """Удаляет комментарии выбранных постов или сами выбранные."""
+    field = 'post' if job.params.get('of_posts') else 'pk'
+    size = settings.PURGE_BATCH_SIZE
+    for chunk in _start(job):
+        comments = Comment.objects.filter(**{f'{field}__in': chunk})
+        for batch in batches(comments, size):
+            raw_delete(Comment.objects.filter(pk__in=batch))
+        job.progress(len(chunk))
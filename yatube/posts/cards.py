@@ -0,0 +1,50 @@
+"""Кеш отрисованных карточек постов («матрёшечное» кеширование).
+
+Карточка поста одинакова во всех лентах (главная, группа, профиль,
+подписки), поэтому HTML каждой карточки кешируется отдельно. Ключ
+содержит версию — хеш всего, что видно в карточке: даты изменения поста,
+имени автора, группы и картинки. Любая правка даёт новый ключ, а старая
+запись просто вытесняется из кеша. Страница ленты достаёт все свои
+карточки одним get_many и рендерит только недостающие.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+
+
+def card_key(post, eager):
+    group = post.group
+    version = hashlib.md5('|'.join((
+        post.updated.isoformat() if post.updated else '',
+        post.author.get_full_name(),
+        f'{group.slug}|{group.title}' if group else '',
+        post.image.name or '',
+    )).encode()).hexdigest()
+    return f'post-card:{post.pk}:{version}:{int(eager)}'
+
+
+def render_cards(posts):
+    """Возвращает список HTML карточек для постов в том же порядке."""
+    posts = list(posts)
+    # Картинки первых карточек грузятся сразу, остальных — лениво, поэтому
+    # у карточки два варианта разметки.
+    keys = [
+        card_key(post, index < settings.RESPONSIVE_IMAGE_EAGER)
+        for index, post in enumerate(posts)
+    ]
+    cards = cache.get_many(keys)
+    missing = {}
+    template = None
+    for index, (post, key) in enumerate(zip(posts, keys)):
+        if key in cards:
+            continue
+        template = template or get_template(CARD_TEMPLATE)
+        missing[key] = template.render({'post': post, 'index': index})
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    return [cards[key] for key in keys]
@@ -0,0 +1,134 @@
+"""Новые посты открытых лент: поток событий и опрос.
+
+Лента задаётся параметрами feed=index — главная, feed=group&group=<slug>
+— группа, feed=follow — подписки пользователя, и переводится в scope'ы
+PostCounter. Поток /events/ (core/events.py) подписывается на них, а
+клиенты без SSE опрашивают view new_posts. Для опроса у каждой ленты
+в общем кеше хранится «верхняя отметка» — id новейшего видимого поста,
+так что частый ответ «новых постов нет» не трогает базу.
+"""
+from collections import defaultdict
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Max, Q
+from django.http import HttpRequest
+
+from .models import Follow, Group, Post
+
+
+def scopes_for(params, user):
+    """Возвращает scope'ы ленты из параметров или None."""
+    feed = params.get('feed')
+    if feed == 'index':
+        return ['all']
+    if feed == 'group':
+        pk = Group.objects.filter(
+            slug=params.get('group', '')
+        ).values_list('pk', flat=True).first()
+        return [f'group:{pk}'] if pk else None
+    if feed == 'follow' and user is not None and user.is_authenticated:
+        authors = Follow.objects.filter(
+            user_id=user.pk
+        ).values_list('author_id', flat=True)
+        return [f'author:{pk}' for pk in authors] or None
+    return None
+
+
+def feed_scopes(params, session_key):
+    """scopes_for() для потока событий: пользователь берётся из сессии."""
+    try:
+        user = None
+        if params.get('feed') == 'follow' and session_key:
+            request = HttpRequest()
+            engine = import_module(settings.SESSION_ENGINE)
+            request.session = engine.SessionStore(session_key)
+            user = get_user(request)
+        return scopes_for(params, user)
+    finally:
+        close_old_connections()
+
+
+def _split(scopes):
+    """Группирует scope'ы 'field:pk' по полю: {'author': [1, 2]}."""
+    fields = defaultdict(list)
+    for scope in scopes:
+        if scope != 'all':
+            field, pk = scope.split(':')
+            fields[field].append(int(pk))
+    return fields
+
+
+def feed_posts(scopes):
+    """Видимые посты, попадающие хотя бы в одну из лент scopes."""
+    posts = Post.objects.visible()
+    if 'all' in scopes:
+        return posts
+    query = Q()
+    for field, pks in _split(scopes).items():
+        query |= Q(**{f'{field}_id__in': pks})
+    return posts.filter(query)
+
+
+def head_key(scope):
+    return f'feed_head:{scope}'
+
+
+def _load_heads(scopes):
+    """Отметки лент scopes из базы: по запросу на поле."""
+    loaded = dict.fromkeys(scopes, 0)
+    if 'all' in scopes:
+        loaded['all'] = Post.objects.visible().order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+    for field, pks in _split(scopes).items():
+        rows = (
+            Post.objects.visible().filter(**{f'{field}_id__in': pks})
+            .order_by().values_list(f'{field}_id').annotate(head=Max('pk'))
+        )
+        for pk, head in rows:
+            loaded[f'{field}:{pk}'] = head
+    return loaded
+
+
+def feed_head(scopes):
+    """Id новейшего видимого поста в лентах scopes (0, если их нет).
+
+    Недостающие отметки считаются одним запросом на поле и кладутся в
+    кеш. Новый пост, пост, перенесённый в другую группу или снова
+    видимый, сбрасывает отметки своих лент (posts/signals.py,
+    posts/bulk.py); после удаления поста отметка может остаться выше
+    реальной — тогда опрос просто сделает лишний запрос и ничего не
+    найдёт. Сброс виден всем воркерам только в общем кеше, поэтому с
+    LocMemCache FEED_HEAD_CACHE_TIMEOUT = 0 и отметки всегда читаются
+    из базы (проверка core.W004).
+    """
+    if not settings.FEED_HEAD_CACHE_TIMEOUT:
+        return max(_load_heads(scopes).values(), default=0)
+    keys = {head_key(scope): scope for scope in scopes}
+    heads = {keys[key]: head for key, head in cache.get_many(keys).items()}
+    missing = [scope for scope in scopes if scope not in heads]
+    if not missing:
+        return max(heads.values(), default=0)
+    loaded = _load_heads(missing)
+    cache.set_many(
+        {head_key(scope): head for scope, head in loaded.items()},
+        settings.FEED_HEAD_CACHE_TIMEOUT,
+    )
+    heads.update(loaded)
+    return max(heads.values(), default=0)
+
+
+def reset_heads(scopes):
+    cache.delete_many([head_key(scope) for scope in scopes])
+
+
+def newer_posts(scopes, since, limit):
+    """Id видимых постов лент scopes новее since, не больше limit."""
+    return list(
+        feed_posts(scopes).filter(pk__gt=since).order_by('-pk')
+        .values_list('pk', flat=True)[:limit]
+    )
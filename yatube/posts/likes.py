@@ -0,0 +1,83 @@
+"""Лайки постов со счётчиком, разбитым на части.
+
+Один счётчик на пост превращается в «горячую» строку: на популярном
+посте каждый лайк ждёт, пока предыдущий отпустит её блокировку. Поэтому
+счётчик разбит на LIKE_COUNTER_SHARDS строк LikeCounter: лайк
+прибавляет единицу к случайной части, а число лайков — сумма частей,
+которую для целой страницы ленты считает один GROUP BY. Отдельная часть
+может уйти в минус (лайк в одну часть, отмена — в другую), сумма
+остаётся точной.
+
+На SQLite запись в базу всё равно одна на всю базу, выигрыш появляется
+на PostgreSQL и MySQL с построчными блокировками.
+"""
+import random
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from . import trending
+from .models import Like, LikeCounter
+
+
+def bump(post_id, delta):
+    shard = random.randrange(settings.LIKE_COUNTER_SHARDS)
+    counter = LikeCounter.objects.filter(post_id=post_id, shard=shard)
+    if counter.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            LikeCounter.objects.create(
+                post_id=post_id, shard=shard, count=delta
+            )
+    except IntegrityError:
+        # Ту же часть одновременно завёл другой запрос.
+        counter.update(count=F('count') + delta)
+
+
+def like(user, post_id):
+    """Ставит лайк; возвращает False, если он уже стоял."""
+    with transaction.atomic():
+        _, created = Like.objects.get_or_create(user=user, post_id=post_id)
+        if created:
+            bump(post_id, 1)
+    if created:
+        trending.bump(post_id, settings.TRENDING_LIKE_WEIGHT)
+    return created
+
+
+def unlike(user, post_id):
+    """Снимает лайк; возвращает False, если его не было."""
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(user=user, post_id=post_id).delete()
+        if deleted:
+            bump(post_id, -1)
+    return bool(deleted)
+
+
+def counts(post_ids):
+    """Число лайков каждого поста — одним запросом."""
+    rows = (
+        LikeCounter.objects.filter(post_id__in=post_ids).order_by()
+        .values_list('post_id').annotate(total=Sum('count'))
+    )
+    return {**dict.fromkeys(post_ids, 0), **dict(rows)}
+
+
+def liked(user, post_ids):
+    """Какие из постов пользователь лайкнул — одним запросом."""
+    if not user.is_authenticated:
+        return set()
+    return set(Like.objects.filter(
+        user=user, post_id__in=post_ids
+    ).values_list('post_id', flat=True))
+
+
+def state(user, post_ids):
+    """Лайки постов для страницы: {id: {'likes': n, 'liked': bool}}."""
+    totals = counts(post_ids)
+    mine = liked(user, post_ids)
+    return {
+        pk: {'likes': totals[pk], 'liked': pk in mine} for pk in post_ids
+    }
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post, render_text
+from posts.tagging import index_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает #теги и @упоминания существующих постов и заново '
+        'размечает их текст (ссылки на теги). Посты обрабатываются '
+        'пачками по возрастанию id, повторный запуск безопасен.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько постов обрабатывать за раз.',
+        )
+
+    def handle(self, *args, **options):
+        size = options['batch_size']
+        last = done = 0
+        while True:
+            posts = list(
+                Post.objects.filter(pk__gt=last).order_by('pk')
+                .only('pk', 'text')[:size]
+            )
+            if not posts:
+                break
+            for post in posts:
+                render_text(post, None, preview=True)
+            Post.objects.bulk_update(posts, ['text_html', 'text_preview'])
+            index_posts(posts)
+            last = posts[-1].pk
+            done += len(posts)
+            self.stdout.write(f'Обработано постов: {done}')
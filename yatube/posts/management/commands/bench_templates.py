@@ -0,0 +1,167 @@
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.db import connection
+from django.template.loader import get_template
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from posts.forms import CommentForm
+from posts.models import Comment, Group, Post, render_text
+
+User = get_user_model()
+TEMPLATES = ('index', 'profile', 'post_detail')
+DUMMY_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+def make_objects(size):
+    """Строит объекты в памяти, не записывая их в базу."""
+    author = User(
+        pk=1, username='bench', first_name='Лев', last_name='Толстой'
+    )
+    group = Group(pk=1, title='Группа', slug='group', description='Описание')
+    now = timezone.now()
+    posts = [
+        Post(pk=i, text=f'Текст поста номер {i} ' * 5, pub_date=now,
+             author=author, group=group)
+        for i in range(1, size + 1)
+    ]
+    comments = [
+        Comment(pk=i, post=posts[0], author=author, text=f'Комментарий {i}')
+        for i in range(1, size + 1)
+    ]
+    # Разметку в базе считает save(), здесь — вручную.
+    for obj in posts:
+        render_text(obj, None, preview=True)
+    for obj in comments:
+        render_text(obj, None)
+    return author, posts, comments
+
+
+def make_context(name, size):
+    author, posts, comments = make_objects(size)
+    page_obj = Paginator(posts, size).get_page(1)
+    if name == 'index':
+        return {'page_obj': page_obj}
+    if name == 'profile':
+        return {
+            'author': author,
+            'page_obj': page_obj,
+            'count': size,
+            'follow_count': 0,
+            'followers_count': 0,
+            'following': False,
+        }
+    return {
+        'post': posts[0],
+        'form': CommentForm(),
+        'comments': comments,
+        'author_posts_count': size,
+        'likes': {'likes': size, 'liked': False},
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время рендеринга index.html, profile.html и '
+        'post_detail.html для 10/100/1000 объектов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='10,100,1000',
+            help='Число объектов на странице, через запятую.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз рендерить каждый шаблон.',
+        )
+        parser.add_argument(
+            '--with-cache', action='store_true',
+            help='Не отключать кеш (по умолчанию {% cache %} не работает).',
+        )
+        parser.add_argument('--output', help='Сохранить результаты в JSON.')
+        parser.add_argument(
+            '--baseline',
+            help='JSON прошлого запуска: упасть, если стало медленнее.',
+        )
+        parser.add_argument(
+            '--max-regression', type=float, default=0.2,
+            help='Допустимое замедление относительно baseline (0.2 = 20%%).',
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        if options['with_cache']:
+            results = self.run(sizes, options['repeat'])
+        else:
+            with override_settings(CACHES=DUMMY_CACHE):
+                results = self.run(sizes, options['repeat'])
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+        if options['baseline']:
+            self.compare(results, options['baseline'],
+                         options['max_regression'])
+
+    def run(self, sizes, repeat):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        results = {}
+        self.stdout.write(
+            f'{"шаблон":<14}{"объектов":>9}{"медиана, мс":>14}'
+            f'{"мин, мс":>10}{"мкс/объект":>12}{"запросов":>10}'
+        )
+        for name in TEMPLATES:
+            template = get_template(f'posts/{name}.html')
+            for size in sizes:
+                context = make_context(name, size)
+                template.render(context, request)
+                timings = []
+                with CaptureQueriesContext(connection) as queries:
+                    for _ in range(repeat):
+                        started = time.perf_counter()
+                        template.render(context, request)
+                        timings.append(time.perf_counter() - started)
+                median = statistics.median(timings) * 1000
+                result = {
+                    'median_ms': round(median, 3),
+                    'min_ms': round(min(timings) * 1000, 3),
+                    'queries': len(queries) // repeat,
+                }
+                results[f'{name}/{size}'] = result
+                self.stdout.write(
+                    f'{name:<14}{size:>9}{result["median_ms"]:>14.2f}'
+                    f'{result["min_ms"]:>10.2f}'
+                    f'{median * 1000 / size:>12.1f}{result["queries"]:>10}'
+                )
+        return results
+
+    def compare(self, results, baseline_path, max_regression):
+        with open(baseline_path) as file:
+            baseline = json.load(file)
+        regressions = []
+        for key, result in results.items():
+            before = baseline.get(key)
+            if not before:
+                continue
+            ratio = result['median_ms'] / before['median_ms'] - 1
+            if ratio > max_regression or result['queries'] > before['queries']:
+                regressions.append(
+                    f'{key}: {before["median_ms"]} → '
+                    f'{result["median_ms"]} мс, '
+                    f'запросов {before["queries"]} → {result["queries"]}'
+                )
+        if regressions:
+            raise CommandError(
+                'Рендеринг стал медленнее:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write('Регрессий нет.')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import rebase
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит эпоху рейтинга популярных постов на текущий момент и '
+        'пересчитывает очки. Запускается периодически (cron, например '
+        'раз в месяц): без переноса очки переполнятся примерно через '
+        '1000 периодов полураспада TRENDING_HALF_LIFE.'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Эпоха рейтинга: {rebase():%Y-%m-%d %H:%M}.')
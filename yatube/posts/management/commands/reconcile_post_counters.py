@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from posts.models import Group, GroupStats, Post, PostCounter
+
+
+def exact_counts():
+    """Точные числа постов для всех лент, посчитанные тремя запросами."""
+    counts = {'all': Post.objects.visible().count()}
+    for field in ('author', 'group'):
+        rows = (
+            Post.objects.visible()
+            .filter(**{f'{field}__isnull': False})
+            .order_by()
+            .values_list(f'{field}_id')
+            .annotate(total=Count('pk'))
+        )
+        counts.update((f'{field}:{pk}', total) for pk, total in rows)
+    return counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет счётчики постов с точными COUNT(*), исправляет '
+        'расхождения и пересчитывает сводки групп. Запускается '
+        'периодически (cron): счётчики уходят, например, после '
+        'QuerySet.update() и массовых правок в обход сигналов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать расхождения.',
+        )
+
+    def handle(self, *args, **options):
+        fixed = removed = created = 0
+        with transaction.atomic():
+            # Сначала блокируем счётчики, потом считаем: новые посты ждут
+            # конца сверки и не попадают в промежуток между ними.
+            counters = list(
+                PostCounter.objects.select_for_update().order_by('scope')
+            )
+            counts = exact_counts()
+            for counter in counters:
+                exact = counts.get(counter.scope)
+                if exact == counter.count:
+                    continue
+                self.stdout.write(
+                    f'{counter.scope}: {counter.count} → {exact or 0}'
+                )
+                if options['dry_run']:
+                    continue
+                if exact is None:
+                    # Автора или группы больше нет — или у них нет постов;
+                    # счётчик заново заведёт первое чтение.
+                    counter.delete()
+                    removed += 1
+                else:
+                    counter.count = exact
+                    counter.save(update_fields=['count'])
+                    fixed += 1
+            # Заодно заводим счётчики лент, которые ещё никто не открывал:
+            # их читает, например, список групп в админке.
+            missing = counts.keys() - {counter.scope for counter in counters}
+            if not options['dry_run']:
+                PostCounter.objects.bulk_create(
+                    [PostCounter(scope=scope, count=counts[scope])
+                     for scope in missing],
+                    ignore_conflicts=True,
+                )
+                created = len(missing)
+                GroupStats.objects.refresh(
+                    Group.objects.values_list('pk', flat=True)
+                )
+        self.stdout.write(
+            f'Исправлено: {fixed}, удалено: {removed}, заведено: {created}.'
+        )
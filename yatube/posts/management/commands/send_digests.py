@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.notifications import send_digests
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет подписчикам письма о новых постах, по одному '
+        'письму на подписчика. Запускается по расписанию.'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Отправлено писем: {send_digests()}')
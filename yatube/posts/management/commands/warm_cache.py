@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from posts.warmup import warm
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает кеш: рендерит первые страницы главной и крупных '
+        'групп, миниатюры и карточки популярных постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int,
+            help='Сколько страниц главной прогреть.',
+        )
+        parser.add_argument(
+            '--groups', type=int,
+            help='Сколько самых крупных групп прогреть.',
+        )
+        parser.add_argument(
+            '--cards', type=int,
+            help='Сколько карточек популярных постов прогреть.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int,
+            help='Сколько страниц рендерить одновременно.',
+        )
+
+    def handle(self, *args, **options):
+        results = warm(
+            pages=options['pages'],
+            groups=options['groups'],
+            cards=options['cards'],
+            concurrency=options['concurrency'],
+        )
+        for url, status, seconds in results:
+            self.stdout.write(f'{status} {seconds * 1000:8.1f} мс  {url}')
+        self.stdout.write(f'Прогрето страниц: {len(results)}.')
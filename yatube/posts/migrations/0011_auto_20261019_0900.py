@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:00
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_auto_20220730_1749'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='text',
+            field=models.TextField(help_text='Текст нового комментария', verbose_name='Текст'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=core.storage.ContentAddressedStorage(), upload_to='posts/', verbose_name='Картинка'),
+        ),
+    ]
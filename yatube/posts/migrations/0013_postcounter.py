@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=50, unique=True, verbose_name='Лента')),
+                ('count', models.IntegerField(default=0, verbose_name='Число постов')),
+            ],
+            options={
+                'verbose_name': 'Счётчик постов',
+                'verbose_name_plural': 'Счётчики постов',
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    for group in Group.objects.all():
+        posts = Post.objects.filter(group=group)
+        latest = posts.order_by('-pub_date').first()
+        GroupStats.objects.create(
+            group=group,
+            posts_count=posts.count(),
+            latest_post=latest,
+            last_activity=latest.pub_date if latest else None,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_trendingscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group', verbose_name='Группа')),
+                ('posts_count', models.IntegerField(default=0, verbose_name='Число постов')),
+                ('last_activity', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Последняя активность')),
+                ('latest_post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='posts.Post', verbose_name='Последний пост')),
+            ],
+            options={
+                'verbose_name': 'Сводка группы',
+                'verbose_name_plural': 'Сводки групп',
+            },
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_groupstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_deleted',
+            field=models.BooleanField(db_index=True, default=False, help_text='Пост скрыт из лент и ждёт фоновой очистки', verbose_name='Удалён'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:24
+
+from django.db import migrations, models
+
+# FTS5-индексы текстов для поиска в админке (core/search.py). Содержимое
+# не дублируется: индекс ссылается на строки таблицы, а триггеры держат
+# его в актуальном состоянии. Только для SQLite.
+FTS_TABLES = (('posts_post', 'text'), ('posts_comment', 'text'))
+CREATE_FTS = (
+    """CREATE VIRTUAL TABLE {table}_fts USING fts5(
+        {column}, content='{table}', content_rowid='id'
+    )""",
+    """CREATE TRIGGER {table}_fts_insert AFTER INSERT ON {table} BEGIN
+        INSERT INTO {table}_fts(rowid, {column})
+        VALUES (new.id, new.{column});
+    END""",
+    """CREATE TRIGGER {table}_fts_delete AFTER DELETE ON {table} BEGIN
+        INSERT INTO {table}_fts({table}_fts, rowid, {column})
+        VALUES ('delete', old.id, old.{column});
+    END""",
+    """CREATE TRIGGER {table}_fts_update AFTER UPDATE OF {column} ON {table}
+    BEGIN
+        INSERT INTO {table}_fts({table}_fts, rowid, {column})
+        VALUES ('delete', old.id, old.{column});
+        INSERT INTO {table}_fts(rowid, {column})
+        VALUES (new.id, new.{column});
+    END""",
+    "INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')",
+)
+DROP_FTS = (
+    'DROP TRIGGER IF EXISTS {table}_fts_insert',
+    'DROP TRIGGER IF EXISTS {table}_fts_delete',
+    'DROP TRIGGER IF EXISTS {table}_fts_update',
+    'DROP TABLE IF EXISTS {table}_fts',
+)
+
+
+def run_fts_sql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for table, column in FTS_TABLES:
+            for statement in statements:
+                schema_editor.execute(
+                    statement.format(table=table, column=column)
+                )
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_post_is_deleted'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата публикации'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='pub_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата публикации'),
+        ),
+        migrations.RunPython(run_fts_sql(CREATE_FTS), run_fts_sql(DROP_FTS)),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:37
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+from core import markup
+
+# SQLite пересоздаёт таблицу при добавлении поля, и триггеры FTS-индекса
+# пропадают вместе со старой таблицей: снимаем индекс и строим заново.
+fts = import_module('posts.migrations.0017_admin_indexes')
+BATCH_SIZE = 500
+
+
+def render_texts(apps, schema_editor):
+    for name, fields in (
+        ('Post', ('text_html', 'text_preview')),
+        ('Comment', ('text_html',)),
+    ):
+        model = apps.get_model('posts', name)
+        rows = model.objects.only('pk', 'text').order_by('pk').iterator()
+        batch = []
+        for row in rows:
+            row.text_html = markup.render(row.text)
+            row.text_preview = markup.preview(row.text, 300)
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                model.objects.bulk_update(batch, fields)
+                batch = []
+        model.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_notification'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            fts.run_fts_sql(fts.DROP_FTS), fts.run_fts_sql(fts.CREATE_FTS)
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='HTML текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='HTML текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_preview',
+            field=models.CharField(blank=True, editable=False, max_length=300, verbose_name='Начало текста'),
+        ),
+        migrations.RunPython(render_texts, migrations.RunPython.noop),
+        migrations.RunPython(
+            fts.run_fts_sql(fts.CREATE_FTS), fts.run_fts_sql(fts.DROP_FTS)
+        ),
+    ]
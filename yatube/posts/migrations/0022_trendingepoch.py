@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_likes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingEpoch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('epoch', models.DateTimeField(verbose_name='Начало отсчёта')),
+            ],
+            options={
+                'verbose_name': 'Эпоха рейтинга',
+                'verbose_name_plural': 'Эпохи рейтинга',
+            },
+        ),
+    ]
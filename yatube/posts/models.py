@@ -1,8 +1,64 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.contrib.auth import get_user_model
 from django.db.models.constraints import UniqueConstraint
+from django.urls import reverse
+
+from core import markup
+from core.storage import post_image_storage
 
 User = get_user_model()
+PREVIEW_LENGTH = 300
+
+
+def entity_url(kind, value):
+    """Адрес ленты тега или профиля упомянутого пользователя."""
+    if kind == 'tag':
+        return reverse('posts:tag_posts', args=(value.lower(),))
+    return reverse('posts:profile', args=(value,))
+
+
+def render_text(instance, update_fields, preview=False):
+    """Размечает text в text_html (и text_preview) перед сохранением.
+
+    Возвращает update_fields с добавленными производными полями; если
+    текст не сохраняется, ничего не пересчитывает.
+    """
+    fields = ['text_html', 'text_preview'] if preview else ['text_html']
+    if update_fields is not None:
+        if 'text' not in update_fields:
+            return update_fields
+        update_fields = set(update_fields).union(fields)
+    instance.text_html = markup.render(instance.text, entity_url)
+    if preview:
+        instance.text_preview = markup.preview(instance.text, PREVIEW_LENGTH)
+    return update_fields
+
+
+class PostQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create() не вызывает save(): размечаем тексты здесь.
+        objs = list(objs)
+        for post in objs:
+            render_text(post, None, preview=True)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def visible(self):
+        """Посты, которые видны в лентах: не удалены.
+
+        Флаг автора is_active здесь не проверяется: снятая в админке
+        галочка «активен» запрещает вход, но не скрывает посты (иначе
+        разошлись бы счётчики лент). Посты удаляемого пользователя
+        скрывает soft_delete_user(), помечая их удалёнными; профиль и
+        комментарии такого автора тоже скрываются по UserDeletion.
+        """
+        return self.filter(is_deleted=False)
+
+    def feed(self):
+        """Видимые посты для лент: карточке хватает превью текста."""
+        return self.visible().select_related('author', 'group').defer(
+            'text', 'text_html'
+        )
 
 
 class Post(models.Model):
@@ -10,9 +66,18 @@ class Post(models.Model):
         'Текст поста',
         help_text='Введите текст поста'
     )
+    text_html = models.TextField('HTML текста', blank=True, editable=False)
+    text_preview = models.CharField(
+        'Начало текста', max_length=PREVIEW_LENGTH, blank=True,
+        editable=False
+    )
     pub_date = models.DateTimeField(
         'Дата публикации',
-        auto_now_add=True)
+        auto_now_add=True,
+        db_index=True)
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True)
     group = models.ForeignKey(
         'Group',
         blank=True,
@@ -31,12 +96,28 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=post_image_storage,
         blank=True
     )
+    is_deleted = models.BooleanField(
+        'Удалён',
+        default=False,
+        db_index=True,
+        help_text='Пост скрыт из лент и ждёт фоновой очистки'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, update_fields=None, **kwargs):
+        update_fields = render_text(self, update_fields, preview=True)
+        # Счётчики постов обновляются в post_save: пусть они и сам пост
+        # фиксируются одной транзакцией. delete() уже атомарен.
+        with transaction.atomic():
+            super().save(*args, update_fields=update_fields, **kwargs)
+
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Пост'
@@ -63,11 +144,18 @@ class Comment(models.Model):
     text = models.TextField(
         'Текст', help_text='Текст нового комментария'
     )
-    created = models.DateTimeField("Дата публикации", auto_now_add=True)
+    text_html = models.TextField('HTML текста', blank=True, editable=False)
+    created = models.DateTimeField(
+        "Дата публикации", auto_now_add=True, db_index=True
+    )
 
     def __str__(self):
         return self.text
 
+    def save(self, *args, update_fields=None, **kwargs):
+        update_fields = render_text(self, update_fields)
+        super().save(*args, update_fields=update_fields, **kwargs)
+
     class Meta:
         ordering = ['-created']
 
@@ -91,3 +179,311 @@ class Follow(models.Model):
                 name='unique_follower'
             )
         ]
+
+
+class UserDeletion(models.Model):
+    """Отметка мягкого удаления пользователя, см. posts/purge.py.
+
+    Отдельная от is_active: снятая в админке галочка «активен» только
+    запрещает вход, а отмеченного пользователя очистка удалит, даже если
+    его успели снова активировать.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='deletion',
+        verbose_name='Пользователь'
+    )
+    created = models.DateTimeField('Дата удаления', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Удалённый пользователь'
+        verbose_name_plural = 'Удалённые пользователи'
+
+
+def post_scopes(author_id, group_id):
+    """Ленты, в которые попадает пост: общая, автора и группы."""
+    scopes = ['all', f'author:{author_id}']
+    if group_id:
+        scopes.append(f'group:{group_id}')
+    return scopes
+
+
+def scope_posts(scope):
+    """Посты ленты scope: 'all', 'author:<id>' или 'group:<id>'."""
+    if scope == 'all':
+        return Post.objects.visible()
+    field, pk = scope.split(':')
+    return Post.objects.visible().filter(**{f'{field}_id': pk})
+
+
+class PostCounterManager(models.Manager):
+    def total(self, scopes):
+        """Суммарное число постов в лентах scopes.
+
+        Отсутствующие счётчики заводятся по точному COUNT(*) — один раз.
+        """
+        counts = dict(
+            self.filter(scope__in=scopes).values_list('scope', 'count')
+        )
+        for scope in set(scopes) - counts.keys():
+            counts[scope] = scope_posts(scope).count()
+            try:
+                with transaction.atomic():
+                    self.create(scope=scope, count=counts[scope])
+            except IntegrityError:
+                # Счётчик одновременно завёл другой запрос.
+                pass
+        return sum(counts.values())
+
+    def bump(self, scopes, delta):
+        # Отсутствующие счётчики не создаём: их заведёт первое чтение.
+        self.filter(scope__in=scopes).update(count=F('count') + delta)
+
+
+class PostCounter(models.Model):
+    """Число постов в ленте, обновляемое при добавлении и удалении постов.
+
+    Заменяет COUNT(*) по всей ленте при каждом показе страницы. Значение
+    может ненадолго расходиться с точным, для паджинатора этого достаточно.
+    """
+    scope = models.CharField('Лента', max_length=50, unique=True)
+    count = models.IntegerField('Число постов', default=0)
+
+    objects = PostCounterManager()
+
+    def __str__(self):
+        return f'{self.scope}: {self.count}'
+
+    class Meta:
+        verbose_name = 'Счётчик постов'
+        verbose_name_plural = 'Счётчики постов'
+
+
+class TrendingScore(models.Model):
+    """Затухающая во времени популярность поста.
+
+    Хранится только верхушка рейтинга (TRENDING_SIZE постов), см.
+    posts/trending.py.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='Пост'
+    )
+    score = models.FloatField('Рейтинг', default=0, db_index=True)
+
+    def __str__(self):
+        return f'{self.post_id}: {self.score:.3g}'
+
+    class Meta:
+        ordering = ['-score']
+        verbose_name = 'Рейтинг поста'
+        verbose_name_plural = 'Рейтинги постов'
+
+
+class TrendingEpoch(models.Model):
+    """Текущая эпоха рейтинга (одна строка); пока её нет — TRENDING_EPOCH.
+
+    Переносится командой rebase_trending, см. posts/trending.py.
+    """
+    epoch = models.DateTimeField('Начало отсчёта')
+
+    def __str__(self):
+        return str(self.epoch)
+
+    class Meta:
+        verbose_name = 'Эпоха рейтинга'
+        verbose_name_plural = 'Эпохи рейтинга'
+
+
+class GroupStatsManager(models.Manager):
+    def refresh(self, group_ids):
+        """Пересчитывает сводку групп по их постам."""
+        for group_id in set(group_ids) - {None}:
+            posts = Post.objects.visible().filter(group_id=group_id)
+            latest = posts.order_by('-pub_date').first()
+            self.update_or_create(group_id=group_id, defaults={
+                'posts_count': posts.count(),
+                'latest_post': latest,
+                'last_activity': latest.pub_date if latest else None,
+            })
+
+
+class GroupStats(models.Model):
+    """Сводка по группе для каталога групп.
+
+    Обновляется сигналами Post, чтобы каталог не агрегировал посты на
+    каждый запрос.
+    """
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Группа'
+    )
+    posts_count = models.IntegerField('Число постов', default=0)
+    last_activity = models.DateTimeField(
+        'Последняя активность', null=True, blank=True, db_index=True
+    )
+    latest_post = models.ForeignKey(
+        Post,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Последний пост'
+    )
+
+    objects = GroupStatsManager()
+
+    def __str__(self):
+        return f'{self.group_id}: {self.posts_count}'
+
+    class Meta:
+        verbose_name = 'Сводка группы'
+        verbose_name_plural = 'Сводки групп'
+
+
+class Notification(models.Model):
+    """Новый пост автора, о котором подписчик ещё не получил письмо.
+
+    Строки создаёт фоновое задание при публикации поста, а команда
+    send_digests собирает их в одно письмо на подписчика и удаляет.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Подписчик'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Пост'
+    )
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_notification'
+            )
+        ]
+
+
+class Tag(models.Model):
+    name = models.CharField('Тег', max_length=50, unique=True)
+
+    def __str__(self):
+        return f'#{self.name}'
+
+    class Meta:
+        verbose_name = 'Тег'
+        verbose_name_plural = 'Теги'
+
+
+class PostTag(models.Model):
+    """Пост с тегом. Уникальный индекс (tag, post) служит и лентой тега."""
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_links',
+        verbose_name='Тег'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='tag_links',
+        verbose_name='Пост'
+    )
+
+    class Meta:
+        verbose_name = 'Тег поста'
+        verbose_name_plural = 'Теги постов'
+        constraints = [
+            UniqueConstraint(fields=['tag', 'post'], name='unique_post_tag')
+        ]
+
+
+class Mention(models.Model):
+    """Упоминание пользователя в посте; индекс (user, post) — лента."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        verbose_name='Пользователь'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='mention_links',
+        verbose_name='Пост'
+    )
+
+    class Meta:
+        verbose_name = 'Упоминание'
+        verbose_name_plural = 'Упоминания'
+        constraints = [
+            UniqueConstraint(fields=['user', 'post'], name='unique_mention')
+        ]
+
+
+class Like(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Пользователь'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Пост'
+    )
+    created = models.DateTimeField('Дата', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Лайк'
+        verbose_name_plural = 'Лайки'
+        constraints = [
+            UniqueConstraint(fields=['user', 'post'], name='unique_like')
+        ]
+
+
+class LikeCounter(models.Model):
+    """Одна из LIKE_COUNTER_SHARDS частей счётчика лайков поста.
+
+    Число лайков — сумма частей. Каждый лайк меняет случайную часть,
+    поэтому одновременные лайки популярного поста не ждут блокировки
+    одной строки (см. posts/likes.py).
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='like_counters',
+        verbose_name='Пост'
+    )
+    shard = models.PositiveSmallIntegerField('Часть')
+    count = models.IntegerField('Лайков', default=0)
+
+    def __str__(self):
+        return f'{self.post_id}/{self.shard}: {self.count}'
+
+    class Meta:
+        verbose_name = 'Счётчик лайков'
+        verbose_name_plural = 'Счётчики лайков'
+        constraints = [
+            UniqueConstraint(
+                fields=['post', 'shard'], name='unique_like_counter'
+            )
+        ]
@@ -0,0 +1,113 @@
+"""Письма подписчикам о новых постах авторов.
+
+Публикация поста ставит задание posts.notify_followers (core/jobs.py):
+оно раскладывает пост по подписчикам автора строками Notification,
+по NOTIFICATION_BATCH_SIZE за один INSERT, так что подписчики
+популярного автора не стоят запроса каждый. Команда send_digests
+(по расписанию, например из cron) собирает накопившиеся уведомления в
+одно письмо на подписчика, отправляет письма пачками через одно
+соединение EMAIL_BACKEND и удаляет отправленное.
+"""
+from itertools import groupby
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db.models import Max
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from core import jobs
+from .models import Follow, Notification, Post
+
+User = get_user_model()
+
+
+def has_followers(author_id):
+    return Follow.objects.filter(author_id=author_id).exists()
+
+
+@jobs.register('posts.notify_followers')
+def notify_followers(job):
+    post = Post.objects.visible().filter(pk=job.target).first()
+    if post is None:
+        # Пост успели удалить, пока задание ждало очереди.
+        return
+    followers = (
+        Follow.objects.filter(author_id=post.author_id)
+        .order_by('user_id').values_list('user_id', flat=True)
+    )
+    size = settings.NOTIFICATION_BATCH_SIZE
+    job.set_total(followers.count())
+    last = 0
+    while True:
+        user_ids = list(followers.filter(user_id__gt=last)[:size])
+        if not user_ids:
+            break
+        Notification.objects.bulk_create(
+            [Notification(user_id=pk, post=post) for pk in user_ids],
+            ignore_conflicts=True,
+        )
+        last = user_ids[-1]
+        job.progress(len(user_ids))
+
+
+def digest_message(user, posts):
+    shown = posts[:settings.DIGEST_MAX_POSTS]
+    context = {
+        'user': user,
+        'posts': [
+            (post, settings.SITE_URL + reverse(
+                'posts:post_detail', args=(post.pk,)
+            ))
+            for post in shown
+        ],
+        'more': len(posts) - len(shown),
+        'follow_url': settings.SITE_URL + reverse('posts:follow_index'),
+    }
+    return mail.EmailMessage(
+        subject=f'Новые посты в ваших подписках: {len(posts)}',
+        body=render_to_string('posts/email/digest.txt', context),
+        to=[user.email],
+    )
+
+
+def send_digests():
+    """Отправляет накопившиеся уведомления; возвращает число писем.
+
+    Уведомления, созданные во время отправки, остаются до следующего
+    запуска. Неактивным пользователям и пользователям без почты письма
+    не уходят, их уведомления просто удаляются.
+    """
+    newest = Notification.objects.aggregate(newest=Max('pk'))['newest']
+    if newest is None:
+        return 0
+    pending = Notification.objects.filter(pk__lte=newest)
+    recipients = (
+        pending.order_by('user_id').values_list('user_id', flat=True)
+        .distinct()
+    )
+    size = settings.NOTIFICATION_BATCH_SIZE
+    connection = mail.get_connection()
+    sent = 0
+    last = 0
+    while True:
+        user_ids = list(recipients.filter(user_id__gt=last)[:size])
+        if not user_ids:
+            return sent
+        batch = pending.filter(user_id__in=user_ids)
+        users = User.objects.filter(is_active=True).exclude(email='')
+        users = users.in_bulk(user_ids)
+        rows = (
+            batch.filter(user_id__in=users, post__in=Post.objects.visible())
+            .select_related('post__author', 'post__group')
+            .order_by('user_id', '-post__pub_date')
+        )
+        messages = [
+            digest_message(users[user_id], [row.post for row in group])
+            for user_id, group in groupby(rows, lambda row: row.user_id)
+        ]
+        if messages:
+            sent += connection.send_messages(messages) or 0
+        batch.delete()
+        last = user_ids[-1]
@@ -0,0 +1,74 @@
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from .models import PostCounter
+
+
+class FeedPaginator(Paginator):
+    """Паджинатор лент с сокращённым списком страниц.
+
+    Число постов берётся из таблицы счётчиков PostCounter по ключу ленты
+    scope вместо COUNT(*) на каждый запрос. Если scope — список, число
+    складывается из нескольких счётчиков (лента подписок).
+    """
+    ELLIPSIS = '…'
+
+    def __init__(self, object_list, per_page, scope=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.scope = scope
+
+    @cached_property
+    def count(self):
+        if self.scope is None:
+            return super().count
+        if isinstance(self.scope, str):
+            return PostCounter.objects.total([self.scope])
+        return PostCounter.objects.total(self.scope)
+
+    def _get_page(self, *args, **kwargs):
+        # Страница остаётся обычным Page, номера для шаблона — атрибутом.
+        page = super()._get_page(*args, **kwargs)
+        page.elided_page_range = list(
+            self.get_elided_page_range(page.number)
+        )
+        return page
+
+    def get_elided_page_range(self, number=1, on_each_side=3, on_ends=2):
+        """Номера страниц с многоточиями вместо длинных пропусков.
+
+        Вокруг текущей страницы показывается on_each_side соседей, в начале
+        и в конце — по on_ends страниц: 1 2 … 7 8 9 10 11 … 49 50.
+        """
+        number = self.validate_number(number)
+        if self.num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > 1 + on_each_side + on_ends + 1:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < self.num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(self.num_pages - on_ends + 1, self.num_pages + 1)
+        else:
+            yield from range(number + 1, self.num_pages + 1)
+
+
+def keyset_page(posts, before, per_page):
+    """Страница постов с id меньше before (курсорная паджинация).
+
+    before — значение параметра ?before=, нечисловое значение означает
+    первую страницу. В отличие от OFFSET, глубина листания не влияет на
+    стоимость запроса: читается ровно per_page + 1 строка индекса.
+    Возвращает посты страницы и курсор следующей страницы (None, если
+    её нет).
+    """
+    if str(before).isdigit():
+        posts = posts.filter(pk__lt=int(before))
+    page = list(posts.order_by('-pk')[:per_page + 1])
+    if len(page) > per_page:
+        return page[:per_page], page[per_page - 1].pk
+    return page, None
@@ -0,0 +1,162 @@
+"""Мягкое удаление пользователей и постов с фоновой очисткой.
+
+Каскадное удаление пользователя в одной транзакции загружает в память
+все его посты и комментарии ради сигналов и надолго занимает
+единственную блокировку записи SQLite. Вместо этого:
+
+1. soft_delete_user() отмечает пользователя UserDeletion, снимает флаг
+   is_active и помечает посты автора удалёнными одним UPDATE,
+   soft_delete_post() ставит Post.is_deleted. Оба сразу скрывают
+   контент из лент (Post.objects.visible()) и поправляют счётчики.
+2. Фоновое задание (core/jobs.py) удаляет зависимые строки пачками по
+   PURGE_BATCH_SIZE, каждую в своей короткой транзакции, массовыми
+   DELETE без загрузки объектов и без сигналов, и отчитывается о
+   прогрессе. Поэтому всё, что делали сигналы (ссылки на картинки,
+   сводки групп), выполняется здесь явно.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q
+
+from core import jobs
+from . import likes
+from .models import (
+    Comment, Follow, GroupStats, Like, LikeCounter, Mention, Notification,
+    Post, PostCounter, PostTag, TrendingScore, UserDeletion,
+)
+from .signals import release_file
+
+User = get_user_model()
+
+
+def raw_delete(queryset):
+    # Удаление одним DELETE: без выборки объектов, каскадов и сигналов.
+    return queryset._raw_delete(queryset.db)
+
+
+def batches(queryset, size):
+    """Отдаёт списки pk пачками, пока queryset не опустеет."""
+    while True:
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True)[
+            :size])
+        if not pks:
+            return
+        yield pks
+
+
+def soft_delete_post(post):
+    post.is_deleted = True
+    post.save(update_fields=['is_deleted'])
+    return jobs.enqueue('posts.purge_post', post.pk)
+
+
+def soft_delete_user(user):
+    """Деактивирует пользователя и ставит очистку его данных в очередь."""
+    with transaction.atomic():
+        UserDeletion.objects.get_or_create(user=user)
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        # Посты автора скрываются из лент сразу, а удаляются в фоне;
+        # вычитаем их из счётчиков.
+        posts = Post.objects.filter(author=user, is_deleted=False)
+        rows = list(
+            posts.order_by().values_list('group_id')
+            .annotate(total=Count('pk'))
+        )
+        posts.update(is_deleted=True)
+        groups = []
+        for group_id, total in rows:
+            PostCounter.objects.bump(['all', f'author:{user.pk}'], -total)
+            if group_id:
+                PostCounter.objects.bump([f'group:{group_id}'], -total)
+                groups.append(group_id)
+        GroupStats.objects.refresh(groups)
+        return jobs.enqueue('posts.purge_user', user.pk)
+
+
+def purge_posts(job, posts, size):
+    groups = set()
+    for pks in batches(posts, size):
+        # Комментариев у пачки постов может быть сколько угодно:
+        # удаляем их своими пачками до транзакции с самими постами, а в
+        # ней — только успевшие появиться за это время.
+        comments = Comment.objects.filter(post__in=pks)
+        for comment_pks in batches(comments, size):
+            raw_delete(Comment.objects.filter(pk__in=comment_pks))
+        with transaction.atomic():
+            batch = Post.objects.filter(pk__in=pks)
+            groups.update(batch.values_list('group_id', flat=True))
+            images = batch.exclude(image='').values_list('image', flat=True)
+            for name in images:
+                release_file(name)
+            GroupStats.objects.filter(latest_post__in=pks).update(
+                latest_post=None
+            )
+            raw_delete(Comment.objects.filter(post__in=pks))
+            raw_delete(TrendingScore.objects.filter(post__in=pks))
+            raw_delete(Notification.objects.filter(post__in=pks))
+            raw_delete(PostTag.objects.filter(post__in=pks))
+            raw_delete(Mention.objects.filter(post__in=pks))
+            raw_delete(Like.objects.filter(post__in=pks))
+            raw_delete(LikeCounter.objects.filter(post__in=pks))
+            raw_delete(batch)
+        job.progress(len(pks))
+    GroupStats.objects.refresh(groups)
+
+
+@jobs.register('posts.purge_post')
+def purge_post(job):
+    post = Post.objects.filter(pk=job.target, is_deleted=True)
+    comments = Comment.objects.filter(post__in=post)
+    size = settings.PURGE_BATCH_SIZE
+    job.set_total(comments.count() + 1)
+    for pks in batches(comments, size):
+        raw_delete(Comment.objects.filter(pk__in=pks))
+        job.progress(len(pks))
+    purge_posts(job, post, size)
+
+
+@jobs.register('posts.purge_user')
+def purge_user(job):
+    user = User.objects.filter(
+        pk=job.target, deletion__isnull=False
+    ).first()
+    if user is None:
+        # Пользователя уже удалили.
+        return
+    size = settings.PURGE_BATCH_SIZE
+    posts = Post.objects.filter(author=user)
+    comments = Comment.objects.filter(author=user)
+    follows = Follow.objects.filter(Q(user=user) | Q(author=user))
+    notifications = Notification.objects.filter(user=user)
+    mentions = Mention.objects.filter(user=user)
+    user_likes = Like.objects.filter(user=user)
+    job.set_total(
+        posts.count() + comments.count() + follows.count()
+        + notifications.count() + mentions.count() + user_likes.count() + 1
+    )
+    purge_posts(job, posts, size)
+    for pks in batches(user_likes, size):
+        with transaction.atomic():
+            batch = Like.objects.filter(pk__in=pks)
+            liked = Counter(batch.values_list('post_id', flat=True))
+            raw_delete(batch)
+            for post_id, total in liked.items():
+                likes.bump(post_id, -total)
+        job.progress(len(pks))
+    for queryset, model in (
+        (comments, Comment),
+        (follows, Follow),
+        (notifications, Notification),
+        (mentions, Mention),
+    ):
+        for pks in batches(queryset, size):
+            raw_delete(model.objects.filter(pk__in=pks))
+            job.progress(len(pks))
+    PostCounter.objects.filter(scope=f'author:{user.pk}').delete()
+    # Зависимых строк не осталось: каскад удаления пользователя пуст.
+    user.delete()
+    job.progress(1)
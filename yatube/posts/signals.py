@@ -0,0 +1,136 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core import events, jobs
+from core.models import MediaBlob
+from .models import Group, GroupStats, Post, PostCounter, post_scopes
+from .events import reset_heads
+from .notifications import has_followers
+from .tagging import index_posts
+
+
+def _image_name(instance):
+    # Читаем значение напрямую из __dict__, чтобы не трогать дескриптор
+    # поля и не подгружать отложенное (defer) поле лишним запросом.
+    value = instance.__dict__.get('image')
+    return getattr(value, 'name', value) or ''
+
+
+def release_file(name):
+    # Файл без ссылок удаляет не этот запрос, а collect_media спустя
+    # срок --grace: тем временем те же байты может загрузить другой пост.
+    MediaBlob.objects.release(name)
+
+
+@receiver(post_init, sender=Post)
+def remember_saved_fields(sender, instance, **kwargs):
+    instance._saved_image = _image_name(instance)
+    instance._saved_group_id = instance.__dict__.get('group_id')
+    instance._saved_is_deleted = instance.__dict__.get('is_deleted', False)
+    # None, если текст отложен (defer) — тогда индекс перестраивается.
+    instance._saved_text = instance.__dict__.get('text')
+
+
+@receiver(post_save, sender=Post)
+def track_image_references(sender, instance, created, **kwargs):
+    old = '' if created else instance._saved_image
+    new = _image_name(instance)
+    if old == new:
+        return
+    if new:
+        MediaBlob.objects.acquire(new)
+    if old:
+        release_file(old)
+    instance._saved_image = new
+
+
+@receiver(post_delete, sender=Post)
+def release_image(sender, instance, **kwargs):
+    name = _image_name(instance)
+    if name:
+        release_file(name)
+
+
+def _visible_scopes(author_id, group_id, is_deleted):
+    return set() if is_deleted else set(post_scopes(author_id, group_id))
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    """Счётчики и сводки групп учитывают только видимые посты."""
+    old_group, new_group = instance._saved_group_id, instance.group_id
+    old = set() if created else _visible_scopes(
+        instance.author_id, old_group, instance._saved_is_deleted
+    )
+    new = _visible_scopes(instance.author_id, new_group, instance.is_deleted)
+    PostCounter.objects.bump(old - new, -1)
+    PostCounter.objects.bump(new - old, 1)
+    if created:
+        if new_group and not instance.is_deleted:
+            GroupStats.objects.filter(group_id=new_group).update(
+                posts_count=F('posts_count') + 1,
+                latest_post=instance,
+                last_activity=instance.pub_date,
+            )
+    elif old != new:
+        GroupStats.objects.refresh([old_group, new_group])
+        # Пост перешёл в другие ленты: их кешированные отметки устарели.
+        transaction.on_commit(partial(reset_heads, old ^ new))
+    instance._saved_group_id = new_group
+    instance._saved_is_deleted = instance.is_deleted
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    PostCounter.objects.bump(_visible_scopes(
+        instance.author_id, instance._saved_group_id,
+        instance._saved_is_deleted,
+    ), -1)
+    GroupStats.objects.refresh([instance._saved_group_id])
+
+
+@receiver(post_save, sender=Post)
+def notify_followers(sender, instance, created, **kwargs):
+    if created and not instance.is_deleted and has_followers(
+        instance.author_id
+    ):
+        jobs.enqueue('posts.notify_followers', instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def index_tags(sender, instance, created, update_fields, **kwargs):
+    if update_fields is not None and 'text' not in update_fields:
+        return
+    if created or instance._saved_text != instance.text:
+        index_posts([instance])
+        instance._saved_text = instance.text
+
+
+def announce(scopes):
+    reset_heads(scopes)
+    events.bus.publish(scopes)
+
+
+@receiver(post_save, sender=Post)
+def publish_new_post(sender, instance, created, **kwargs):
+    # Открытые ленты узнают о посте только после фиксации транзакции.
+    if created and not instance.is_deleted:
+        transaction.on_commit(partial(
+            announce, post_scopes(instance.author_id, instance.group_id)
+        ))
+
+
+@receiver(post_save, sender=Group)
+def create_group_stats(sender, instance, created, **kwargs):
+    if created:
+        GroupStats.objects.get_or_create(group=instance)
+
+
+@receiver(post_delete, sender=Group)
+def drop_group_counter(sender, instance, **kwargs):
+    # Посты группы остаются без группы через SET_NULL, минуя сигналы Post.
+    PostCounter.objects.filter(scope=f'group:{instance.pk}').delete()
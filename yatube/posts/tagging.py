@@ -0,0 +1,57 @@
+"""Индекс #тегов и @упоминаний в текстах постов.
+
+Теги и упоминания разбираются из текста при сохранении поста (сигнал в
+posts/signals.py) и хранятся строками PostTag и Mention. Их уникальные
+индексы (tag, post) и (user, post) упорядочены по посту, поэтому лента
+тега и лента «меня упомянули» — чтение одного диапазона индекса с
+курсором по id поста (keyset_page), без OFFSET и COUNT(*).
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from core.markup import entities
+from .models import Mention, PostTag, Tag
+
+User = get_user_model()
+
+
+def tag_ids(names):
+    """id тегов по именам; недостающие теги создаются."""
+    if not names:
+        return {}
+    Tag.objects.bulk_create(
+        [Tag(name=name) for name in names], ignore_conflicts=True
+    )
+    return dict(
+        Tag.objects.filter(name__in=names).values_list('name', 'pk')
+    )
+
+
+def index_posts(posts):
+    """Перестраивает теги и упоминания постов несколькими запросами.
+
+    Запросов столько же для одного поста, сколько и для пачки, поэтому
+    команда backfill_tags передаёт посты пачками.
+    """
+    parsed = {post.pk: entities(post.text) for post in posts}
+    if not parsed:
+        return
+    ids = tag_ids(set().union(*(tags for tags, _ in parsed.values())))
+    usernames = set().union(*(mentions for _, mentions in parsed.values()))
+    users = dict(
+        User.objects.filter(
+            username__in=usernames, deletion__isnull=True
+        ).values_list('username', 'pk')
+    ) if usernames else {}
+    with transaction.atomic():
+        PostTag.objects.filter(post__in=parsed).delete()
+        Mention.objects.filter(post__in=parsed).delete()
+        PostTag.objects.bulk_create(
+            PostTag(tag_id=ids[name], post_id=pk)
+            for pk, (tags, _) in parsed.items() for name in tags
+        )
+        Mention.objects.bulk_create(
+            Mention(user_id=users[name], post_id=pk)
+            for pk, (_, mentions) in parsed.items()
+            for name in mentions if name in users
+        )
@@ -0,0 +1,12 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..cards import render_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Возвращает HTML карточек постов; недостающие рендерит и кеширует."""
+    return [mark_safe(card) for card in render_cards(posts)]
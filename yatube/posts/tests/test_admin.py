@@ -0,0 +1,214 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
+from django.contrib.admin import site
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import jobs
+from core.models import Job
+from ..models import Comment, Group, GroupStats, Post, PostCounter
+
+User = get_user_model()
+
+
+class AdminChangelistTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {i}', slug=f'admin-{i}', description='-'
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def changelist_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_queries_do_not_grow_with_rows(self):
+        """Число запросов списка постов не зависит от числа строк."""
+        url = reverse('admin:posts_post_changelist')
+        for i in range(2):
+            Post.objects.create(
+                text=f'Пост {i}', author=self.admin, group=self.groups[0]
+            )
+        few = self.changelist_queries(url)
+        for i in range(20):
+            Post.objects.create(
+                text=f'Ещё {i}', author=self.admin,
+                group=self.groups[i % 3]
+            )
+        self.assertEqual(self.changelist_queries(url), few)
+
+    def test_full_text_search(self):
+        post = Post.objects.create(
+            text='Редкое слово кракозябра', author=self.admin
+        )
+        Post.objects.create(text='Обычный пост', author=self.admin)
+        Comment.objects.create(
+            post=post, author=self.admin, text='Кракозябра в комментарии'
+        )
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'кракоз'}
+        )
+        self.assertEqual(list(response.context['cl'].result_list), [post])
+        response = self.client.get(
+            reverse('admin:posts_comment_changelist'), {'q': 'комментар'}
+        )
+        self.assertEqual(response.context['cl'].result_count, 1)
+        response = self.client.get(
+            reverse('admin:posts_comment_changelist'), {'q': 'admin'}
+        )
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+
+@override_settings(JOBS_RUN_IN_THREAD=False, PURGE_BATCH_SIZE=2)
+class AdminBulkActionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.source = Group.objects.create(
+            title='Откуда', slug='source', description='-'
+        )
+        cls.target = Group.objects.create(
+            title='Куда', slug='target', description='-'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+        self.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=self.admin, group=self.source
+            )
+            for i in range(5)
+        ]
+
+    def act(self, url_name, action, objects, **data):
+        return self.client.post(reverse(url_name), {
+            'action': action,
+            ACTION_CHECKBOX_NAME: [obj.pk for obj in objects],
+            **data,
+        })
+
+    def test_confirmation_then_job(self):
+        """Сначала страница подтверждения, после неё — задание."""
+        response = self.act(
+            'admin:posts_post_changelist', 'move_to_group', self.posts[:3]
+        )
+        self.assertTemplateUsed(response, 'admin/posts/bulk_action.html')
+        self.assertFalse(Job.objects.exists())
+        response = self.act(
+            'admin:posts_post_changelist', 'move_to_group', self.posts[:3],
+            confirm='yes', group=self.target.pk,
+        )
+        job = Job.objects.get()
+        self.assertRedirects(
+            response, reverse('job_progress', args=(job.pk,)),
+            fetch_redirect_response=False,
+        )
+        jobs.run_pending()
+        self.assertEqual(
+            Post.objects.filter(group=self.target).count(), 3
+        )
+        self.assertEqual(
+            PostCounter.objects.total([f'group:{self.source.pk}']), 2
+        )
+        self.assertEqual(
+            PostCounter.objects.total([f'group:{self.target.pk}']), 3
+        )
+        stats = GroupStats.objects.get(group=self.target)
+        self.assertEqual(stats.posts_count, 3)
+        progress = self.client.get(
+            reverse('job_progress', args=(job.pk,)), {'format': 'json'}
+        ).json()
+        self.assertEqual(progress['status'], Job.DONE)
+        self.assertEqual(progress['done'], 3)
+
+    def test_long_selection_shows_only_count(self):
+        with self.settings(BULK_ACTION_LIST_LIMIT=2):
+            response = self.act(
+                'admin:posts_post_changelist', 'delete_posts', self.posts
+            )
+        self.assertIsNone(response.context['objects'])
+        self.assertEqual(response.context['count'], 5)
+
+    def test_delete_posts_and_comments(self):
+        for post in self.posts:
+            Comment.objects.create(post=post, author=self.admin, text='-')
+        self.act(
+            'admin:posts_comment_changelist', 'delete_comments',
+            Comment.objects.filter(post=self.posts[0]), confirm='yes',
+        )
+        self.act(
+            'admin:posts_post_changelist', 'delete_posts', self.posts[1:4],
+            confirm='yes',
+        )
+        jobs.run_pending()
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(PostCounter.objects.total(['all']), 2)
+
+    def test_select_across_stores_filters_not_pks(self):
+        """«Выбрать все» передаёт заданию фильтры списка, а не все pk."""
+        other = Post.objects.create(text='Другой', author=self.admin)
+        response = self.client.post(
+            reverse('admin:posts_post_changelist') + '?q=Пост', {
+                'action': 'delete_posts',
+                ACTION_CHECKBOX_NAME: [self.posts[0].pk],
+                'select_across': '1',
+                'confirm': 'yes',
+            }
+        )
+        self.assertEqual(response.status_code, 302)
+        params = Job.objects.get().params
+        self.assertNotIn('pks', params)
+        self.assertEqual(params['filters'], 'q=%D0%9F%D0%BE%D1%81%D1%82')
+        late = Post.objects.create(text='Пост позже', author=self.admin)
+        jobs.run_pending()
+        self.assertEqual(set(Post.objects.all()), {other, late})
+
+    def test_actions_need_permissions(self):
+        """Staff-пользователь только с правом просмотра не видит действий."""
+        viewer = User.objects.create_user('viewer', is_staff=True)
+        viewer.user_permissions.set(Permission.objects.filter(
+            codename__in=('view_post', 'view_comment')
+        ))
+        self.client.force_login(viewer)
+        response = self.act(
+            'admin:posts_post_changelist', 'delete_posts', self.posts,
+            confirm='yes',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Job.objects.exists())
+        request = RequestFactory().get('/')
+        request.user = viewer
+        for model in (Post, Comment):
+            self.assertEqual(site._registry[model].get_actions(request), {})
+
+    def test_job_payload_is_read_only(self):
+        """Параметры задания не правятся в админке: их выполнит run_jobs."""
+        job = jobs.enqueue('posts.bulk_delete', params={'pks': []})
+        response = self.client.post(
+            reverse('admin:core_job_change', args=(job.pk,)),
+            {'payload': '{"pks": [1]}'},
+        )
+        self.assertEqual(response.status_code, 302)
+        job.refresh_from_db()
+        self.assertEqual(job.params, {'pks': []})
@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, PostCounter
+
+User = get_user_model()
+
+
+class BenchTemplatesTests(TestCase):
+    def test_bench_reports_every_template(self):
+        """Бенчмарк рендерит все три шаблона для каждого размера."""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'bench.json')
+            call_command(
+                'bench_templates', sizes='1,5', repeat=1, output=output,
+                stdout=StringIO(),
+            )
+            with open(output) as file:
+                results = json.load(file)
+        self.assertEqual(set(results), {
+            f'{name}/{size}'
+            for name in ('index', 'profile', 'post_detail')
+            for size in (1, 5)
+        })
+
+    def test_bench_fails_on_regression(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as baseline:
+            json.dump(
+                {'index/1': {'median_ms': 0.0001, 'queries': 0}}, baseline
+            )
+            baseline.flush()
+            with self.assertRaises(CommandError):
+                call_command(
+                    'bench_templates', sizes='1', repeat=1,
+                    baseline=baseline.name, stdout=StringIO(),
+                )
+
+
+class ReconcilePostCountersTests(TestCase):
+    def test_drift_is_fixed(self):
+        """Сверка исправляет счётчики, ушедшие мимо сигналов."""
+        user = User.objects.create_user(username='drift')
+        group = Group.objects.create(
+            title='Группа', slug='drift', description='Описание'
+        )
+        post = Post.objects.create(text='Пост', author=user, group=group)
+        PostCounter.objects.total(['all'])
+        Post.objects.filter(pk=post.pk).update(group=None)
+        PostCounter.objects.filter(scope='all').update(count=5)
+        call_command('reconcile_post_counters', stdout=StringIO())
+        self.assertEqual(
+            dict(PostCounter.objects.values_list('scope', 'count')),
+            {'all': 1, f'author:{user.pk}': 1},
+        )
+
+
+class WarmCacheTests(TestCase):
+    def test_index_is_cached_after_warmup(self):
+        """После прогрева главная отдаётся из кеша."""
+        cache.clear()
+        user = User.objects.create_user(username='warm')
+        group = Group.objects.create(
+            title='Группа', slug='warm', description='Описание'
+        )
+        Post.objects.create(text='Старый пост', author=user, group=group)
+        output = StringIO()
+        call_command('warm_cache', concurrency=1, stdout=output)
+        self.assertIn('/group/warm/', output.getvalue())
+        Post.objects.create(text='Новый пост', author=user)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Старый пост')
+        self.assertNotContains(response, 'Новый пост')
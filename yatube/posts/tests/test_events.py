@@ -0,0 +1,136 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from ..events import feed_scopes
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class FeedScopesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user('reader')
+        cls.authors = [User.objects.create_user(f'author{i}') for i in (1, 2)]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.reader, author=author)
+        cls.group = Group.objects.create(
+            title='Группа', slug='events', description='-'
+        )
+
+    def test_public_feeds(self):
+        self.assertEqual(feed_scopes({'feed': 'index'}, None), ['all'])
+        self.assertEqual(
+            feed_scopes({'feed': 'group', 'group': 'events'}, None),
+            [f'group:{self.group.pk}'],
+        )
+        self.assertIsNone(feed_scopes({'feed': 'group', 'group': '-'}, None))
+
+    def test_follow_feed_uses_session(self):
+        """Лента подписок берётся у пользователя из сессии."""
+        self.assertIsNone(feed_scopes({'feed': 'follow'}, None))
+        self.client.force_login(self.reader)
+        scopes = feed_scopes(
+            {'feed': 'follow'}, self.client.session.session_key
+        )
+        self.assertCountEqual(
+            scopes, [f'author:{author.pk}' for author in self.authors]
+        )
+
+    @override_settings(EVENTS_ENABLED=True)
+    def test_feed_page_subscribes(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'data-events="/events/?feed=index"')
+        self.assertContains(response, 'data-poll="/new/?feed=index"')
+
+    def test_feed_page_polls_without_asgi(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'data-events=""')
+        self.assertContains(response, 'data-poll="/new/?feed=index"')
+
+
+class NewPostsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('poller')
+        cls.group = Group.objects.create(
+            title='Опрос', slug='poll', description='-'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.author,
+                group=cls.group if i % 2 else None,
+            )
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def poll(self, **params):
+        response = self.client.get(reverse('posts:new_posts'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_counts_newer_posts(self):
+        since = self.posts[1].pk
+        data = self.poll(feed='index', since=since)
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data['ids'], [post.pk for post in self.posts[:1:-1]])
+        self.assertEqual(data['newest'], self.posts[-1].pk)
+        data = self.poll(feed='group', group='poll', since=since)
+        self.assertEqual(data['ids'], [self.posts[3].pk])
+
+    @override_settings(NEW_POSTS_LIMIT=2)
+    def test_limit(self):
+        data = self.poll(feed='index', since=0)
+        self.assertEqual(data['count'], 2)
+        self.assertTrue(data['more'])
+
+    @override_settings(FEED_HEAD_CACHE_TIMEOUT=60)
+    def test_up_to_date_poll_skips_database(self):
+        """Клиент без новых постов получает ответ из кеша."""
+        newest = self.poll(feed='index')['newest']
+        with self.assertNumQueries(0):
+            data = self.poll(feed='index', since=newest)
+        self.assertEqual(data['count'], 0)
+
+    @override_settings(FEED_HEAD_CACHE_TIMEOUT=0)
+    def test_process_local_cache_reads_head_from_database(self):
+        """Без общего кеша отметка не кешируется и не устаревает."""
+        newest = self.poll(feed='index')['newest']
+        self.assertEqual(cache.get('feed_head:all'), None)
+        # bulk_create() не шлёт сигналов и не сбрасывает отметку.
+        Post.objects.bulk_create([Post(text='Новый', author=self.author)])
+        data = self.poll(feed='index', since=newest)
+        self.assertEqual(data['count'], 1)
+
+    def test_unknown_feed(self):
+        response = self.client.get(
+            reverse('posts:new_posts'), {'feed': 'follow'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(JOBS_RUN_IN_THREAD=False)
+class FeedHeadResetTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('mover')
+        self.group = Group.objects.create(
+            title='Куда', slug='target', description='-'
+        )
+
+    def test_moved_post_resets_group_head(self):
+        """Пост, перенесённый в группу, сразу виден опросу её ленты."""
+        params = {'feed': 'group', 'group': 'target', 'since': 0}
+        url = reverse('posts:new_posts')
+        self.assertEqual(self.client.get(url, params).json()['count'], 0)
+        post = Post.objects.create(text='Пост', author=self.author)
+        post.group = self.group
+        post.save()
+        self.assertEqual(
+            self.client.get(url, params).json()['ids'], [post.pk]
+        )
@@ -1,3 +1,4 @@
+import hashlib
 import tempfile
 import shutil
 import os
@@ -5,6 +6,7 @@ import os
 from django.contrib.auth import get_user_model
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from core.models import MediaBlob
 from ..models import Group, Post, Comment
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.conf import settings
@@ -14,6 +16,11 @@ User = get_user_model()
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
+def hashed_name(content, ext):
+    digest = hashlib.sha256(content).hexdigest()
+    return f'posts/{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostFormTests(TestCase):
     def setUp(self):
@@ -109,7 +116,7 @@ class PostFormTests(TestCase):
             Post.objects.filter(
                 group=self.group_old.id,
                 text='test_new_post',
-                image='posts/small_old2.gif',
+                image=hashed_name(self.small_gif_old2, '.gif'),
             ).exists()
         )
 
@@ -146,17 +153,34 @@ class PostFormTests(TestCase):
             Post.objects.filter(
                 group=self.group_new.id,
                 text='test_edit_post',
-                image='posts/small_new.gif'
+                image=hashed_name(self.small_gif_new, '.gif')
             ).exists()
         )
         self.assertFalse(
             Post.objects.filter(
                 group=self.group_old.id,
                 text='test_post',
-                image='posts/small_old1.gif'
+                image=hashed_name(self.small_gif_old1, '.gif')
             ).exists()
         )
 
+    def test_same_image_is_stored_once(self):
+        """Одинаковые картинки хранятся одним файлом со счётчиком ссылок."""
+        duplicate = Post.objects.create(
+            text='test_duplicate',
+            author=self.author,
+            image=self.uploaded_old2
+        )
+        name = hashed_name(self.small_gif_old2, '.gif')
+        self.assertEqual(duplicate.image.name, name)
+        self.assertEqual(self.post.image.name, name)
+        self.assertEqual(
+            len(os.listdir(os.path.dirname(duplicate.image.path))), 1
+        )
+        self.assertEqual(MediaBlob.objects.get(name=name).refcount, 2)
+        duplicate.delete()
+        self.assertEqual(MediaBlob.objects.get(name=name).refcount, 1)
+
     def test_create_comment(self):
         """Проверка формы создания нового комментария."""
         post = self.post
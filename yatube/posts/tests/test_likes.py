@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import likes
+from ..models import Like, LikeCounter, Post
+
+User = get_user_model()
+
+
+@override_settings(LIKE_COUNTER_SHARDS=4)
+class LikesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('liked')
+        cls.users = [User.objects.create_user(f'fan{i}') for i in range(12)]
+        cls.posts = [
+            Post.objects.create(text=f'Пост {i}', author=cls.author)
+            for i in range(10)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sharded_counter(self):
+        """Число лайков — сумма частей счётчика."""
+        post = self.posts[0]
+        for user in self.users:
+            self.assertTrue(likes.like(user, post.pk))
+        self.assertFalse(likes.like(self.users[0], post.pk))
+        for user in self.users[:5]:
+            self.assertTrue(likes.unlike(user, post.pk))
+        self.assertFalse(likes.unlike(self.users[0], post.pk))
+        self.assertGreater(LikeCounter.objects.filter(post=post).count(), 1)
+        self.assertEqual(likes.counts([post.pk])[post.pk], 7)
+        self.assertEqual(Like.objects.filter(post=post).count(), 7)
+
+    def test_like_views(self):
+        post = self.posts[1]
+        self.client.force_login(self.users[0])
+        response = self.client.post(
+            reverse('posts:post_like', args=(post.pk,)),
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.json(), {'likes': 1, 'liked': True})
+        response = self.client.post(
+            reverse('posts:post_unlike', args=(post.pk,))
+        )
+        self.assertRedirects(
+            response, reverse('posts:post_detail', args=(post.pk,))
+        )
+        self.assertFalse(Like.objects.exists())
+
+    def page_state_queries(self, posts):
+        ids = ','.join(str(post.pk) for post in posts)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('posts:likes_state'), {'ids': ids}
+            )
+        return response.json(), len(queries)
+
+    def test_page_state_in_constant_queries(self):
+        """Лайки страницы ленты — одинаковое число запросов на любую."""
+        user = self.users[0]
+        likes.like(user, self.posts[2].pk)
+        likes.like(self.users[1], self.posts[2].pk)
+        self.client.force_login(user)
+        self.page_state_queries(self.posts[:1])
+        _, few = self.page_state_queries(self.posts[:2])
+        data, many = self.page_state_queries(self.posts)
+        self.assertEqual(few, many)
+        self.assertEqual(
+            data['posts'][str(self.posts[2].pk)], {'likes': 2, 'liked': True}
+        )
+        self.assertEqual(
+            data['posts'][str(self.posts[3].pk)], {'likes': 0, 'liked': False}
+        )
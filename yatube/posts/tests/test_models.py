@@ -1,6 +1,6 @@
 from django.test import TestCase
 
-from ..models import Group, Post, User
+from ..models import Comment, Group, Post, User
 
 
 class PostModelTest(TestCase):
@@ -66,3 +66,30 @@ class PostModelTest(TestCase):
             with self.subTest(field=field):
                 self.assertEqual(
                     group._meta.get_field(field).help_text, expected_value)
+
+
+class RenderedTextTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='markup')
+
+    def test_text_is_rendered_on_save(self):
+        """HTML и превью текста считаются при сохранении."""
+        post = Post.objects.create(author=self.user, text='**Пост**')
+        self.assertEqual(post.text_html, '<p><strong>Пост</strong></p>')
+        self.assertEqual(post.text_preview, 'Пост')
+        post.text = '*Правка*'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p><em>Правка</em></p>')
+        comment = Comment.objects.create(
+            post=post, author=self.user, text='`код`'
+        )
+        self.assertEqual(comment.text_html, '<p><code>код</code></p>')
+
+    def test_feed_does_not_load_text(self):
+        Post.objects.create(author=self.user, text='Текст')
+        post = Post.objects.feed().get()
+        self.assertEqual(
+            post.get_deferred_fields(), {'text', 'text_html'}
+        )
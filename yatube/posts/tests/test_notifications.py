@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job
+from ..models import Follow, Notification, Post
+from ..notifications import send_digests
+
+User = get_user_model()
+
+
+@override_settings(
+    JOBS_RUN_IN_THREAD=False, NOTIFICATION_BATCH_SIZE=3, DIGEST_MAX_POSTS=2
+)
+class DigestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author')
+        cls.followers = [
+            User.objects.create_user(f'reader{i}', f'reader{i}@example.com')
+            for i in range(7)
+        ]
+        Follow.objects.bulk_create(
+            Follow(user=user, author=cls.author) for user in cls.followers
+        )
+
+    def publish(self, count):
+        for i in range(count):
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+        jobs.run_pending()
+
+    def test_fan_out_uses_batches(self):
+        """Раскладка по подписчикам — один INSERT на пачку."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        with CaptureQueriesContext(connection) as queries:
+            jobs.run_pending()
+        inserts = [
+            query for query in queries
+            if query['sql'].startswith('INSERT')
+            and '"posts_notification"' in query['sql']
+        ]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(
+            Notification.objects.filter(post=post).count(), 7
+        )
+
+    def test_done_jobs_are_pruned(self):
+        """Выполненные задания раскладки не копятся: run_jobs их удаляет."""
+        self.publish(3)
+        pending = Job.objects.create(kind='posts.notify_followers')
+        self.assertEqual(jobs.prune(), 0)
+        Job.objects.filter(status=Job.DONE).update(
+            updated=timezone.now() - settings.JOBS_KEEP_DONE * 2
+        )
+        self.assertEqual(jobs.prune(), 3)
+        self.assertEqual(list(Job.objects.all()), [pending])
+
+    def test_one_digest_per_follower(self):
+        """Несколько постов сводятся в одно письмо подписчику."""
+        self.publish(3)
+        self.assertEqual(send_digests(), 7)
+        self.assertEqual(len(mail.outbox), 7)
+        body = mail.outbox[0].body
+        self.assertIn('Пост 2', body)
+        self.assertNotIn('Пост 0', body)
+        self.assertIn('И ещё постов: 1', body)
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(send_digests(), 0)
+
+    def test_inactive_and_deleted_are_skipped(self):
+        self.publish(1)
+        User.objects.filter(pk=self.followers[0].pk).update(is_active=False)
+        self.assertEqual(send_digests(), 6)
+        self.publish(1)
+        Post.objects.update(is_deleted=True)
+        self.assertEqual(send_digests(), 0)
+        self.assertFalse(Notification.objects.exists())
@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from ..models import Group, Post, PostCounter
+from ..paginator import FeedPaginator
+
+User = get_user_model()
+
+
+class FeedPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='counter')
+        cls.group = Group.objects.create(
+            title='Группа', slug='counter', description='Описание'
+        )
+        cls.other = Group.objects.create(
+            title='Другая', slug='other', description='Описание'
+        )
+
+    def test_elided_page_range(self):
+        """Длинный список страниц сокращается многоточиями."""
+        paginator = FeedPaginator(list(range(500)), 10)
+        ellipsis = FeedPaginator.ELLIPSIS
+        self.assertEqual(
+            list(paginator.get_elided_page_range(10)),
+            [1, 2, ellipsis, 7, 8, 9, 10, 11, 12, 13, ellipsis, 49, 50],
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(1)),
+            [1, 2, 3, 4, ellipsis, 49, 50],
+        )
+        self.assertEqual(
+            list(FeedPaginator(list(range(50)), 10).get_elided_page_range()),
+            [1, 2, 3, 4, 5],
+        )
+
+    def test_counters_follow_posts(self):
+        """Счётчики лент меняются вместе с постами без COUNT(*)."""
+        post = Post.objects.create(
+            text='Первый', author=self.user, group=self.group
+        )
+        scopes = ('all', f'author:{self.user.pk}', f'group:{self.group.pk}')
+        for scope in scopes:
+            self.assertEqual(PostCounter.objects.total([scope]), 1)
+        Post.objects.create(text='Второй', author=self.user)
+        post.group = self.other
+        post.save()
+        self.assertEqual(PostCounter.objects.total(['all']), 2)
+        self.assertEqual(
+            PostCounter.objects.total([f'group:{self.group.pk}']), 0
+        )
+        post.delete()
+        paginator = FeedPaginator(
+            Post.objects.all(), 10, scope=f'author:{self.user.pk}'
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, 1)
@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.jobs import run_pending
+from core.models import Job
+from ..models import Comment, Follow, Group, Post, PostCounter
+from ..purge import soft_delete_post, soft_delete_user
+
+User = get_user_model()
+
+
+@override_settings(PURGE_BATCH_SIZE=2, JOBS_RUN_IN_THREAD=False)
+class PurgeTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='prolific')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='purge', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.author, group=cls.group
+            )
+            for i in range(5)
+        ]
+        cls.other = Post.objects.create(text='Чужой', author=cls.reader)
+        for post in cls.posts[:3]:
+            Comment.objects.create(post=post, author=cls.reader, text='Да')
+        Comment.objects.create(post=cls.other, author=cls.author, text='Нет')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_user_is_hidden_then_purged_in_batches(self):
+        """Контент скрыт сразу, а удаляется фоновым заданием пачками."""
+        PostCounter.objects.total(['all', f'group:{self.group.pk}'])
+        job = soft_delete_user(self.author)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(list(response.context['page_obj']), [self.other])
+        self.assertEqual(PostCounter.objects.total(['all']), 1)
+        self.assertEqual(
+            PostCounter.objects.total([f'group:{self.group.pk}']), 0
+        )
+        self.assertEqual(
+            self.client.get(
+                reverse('posts:profile', args=(self.author.username,))
+            ).status_code,
+            HTTPStatus.NOT_FOUND,
+        )
+
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual((job.done, job.total), (8, 8))
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(Comment.objects.count(), 0)
+        self.assertEqual(Follow.objects.count(), 0)
+
+    def test_deactivated_author_keeps_posts_in_feeds(self):
+        """Снятый флаг «активен» не скрывает посты и не сбивает счётчики."""
+        self.author.is_active = False
+        self.author.save()
+        response = self.client.get(
+            reverse('posts:group_posts', args=(self.group.slug,))
+        )
+        self.assertEqual(len(response.context['page_obj']), 5)
+        self.assertEqual(response.context['page_obj'].paginator.count, 5)
+        response = self.client.get(
+            reverse('posts:profile', args=(self.author.username,))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.other.pk,))
+        )
+        self.assertEqual(len(response.context['comments']), 1)
+
+    def test_reactivated_user_is_still_purged(self):
+        """Очистку отменяет не флаг «активен», а только UserDeletion."""
+        job = soft_delete_user(self.author)
+        self.author.is_active = True
+        self.author.save()
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_user_posts_comments_are_purged_in_batches(self):
+        """Комментарии пачки постов удаляются по PURGE_BATCH_SIZE."""
+        for _ in range(3):
+            last = Comment.objects.create(
+                post=self.posts[0], author=self.reader, text='Ещё'
+            )
+        soft_delete_user(self.author)
+        with CaptureQueriesContext(connection) as queries:
+            run_pending()
+        deletes = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('DELETE FROM "posts_comment"')
+        ]
+        # 5 комментариев к постам первой пачки — по 2, не одним DELETE.
+        self.assertIn(
+            'DELETE FROM "posts_comment" '
+            f'WHERE "posts_comment"."id" IN ({last.pk})',
+            deletes
+        )
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_post_is_hidden_then_purged(self):
+        post = self.posts[0]
+        job = soft_delete_post(post)
+        response = self.client.get(
+            reverse('posts:post_detail', args=(post.pk,))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertFalse(Post.objects.filter(pk=post.pk).exists())
+        self.assertFalse(Comment.objects.filter(post=post.pk).exists())
+        self.group.stats.refresh_from_db()
+        self.assertEqual(self.group.stats.posts_count, 4)
@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Mention, Post, PostTag, Tag
+
+User = get_user_model()
+
+
+@override_settings(JOBS_RUN_IN_THREAD=False)
+class TagsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('writer')
+        cls.reader = User.objects.create_user('reader')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_index_follows_text(self):
+        """Теги и упоминания переиндексируются при правке текста."""
+        post = Post.objects.create(
+            text='#Django и #python для @reader и @nobody', author=self.author
+        )
+        self.assertCountEqual(
+            PostTag.objects.filter(post=post).values_list(
+                'tag__name', flat=True
+            ),
+            ['django', 'python'],
+        )
+        self.assertEqual(
+            list(Mention.objects.values_list('user', flat=True)),
+            [self.reader.pk],
+        )
+        self.assertIn(
+            f'href="{reverse("posts:tag_posts", args=("django",))}"',
+            post.text_html,
+        )
+        post.text = 'Только #python'
+        post.save()
+        self.assertEqual(
+            list(post.tag_links.values_list('tag__name', flat=True)),
+            ['python'],
+        )
+        self.assertFalse(Mention.objects.exists())
+
+    def test_tag_feed_keyset_pagination(self):
+        posts = [
+            Post.objects.create(text=f'Пост {i} #тест', author=self.author)
+            for i in range(13)
+        ]
+        Post.objects.create(text='Без тега', author=self.author)
+        url = reverse('posts:tag_posts', args=('Тест',))
+        response = self.client.get(url)
+        self.assertEqual(response.context['posts'], posts[:2:-1])
+        next_before = response.context['next_before']
+        self.assertEqual(next_before, posts[3].pk)
+        response = self.client.get(url, {'before': next_before})
+        self.assertEqual(response.context['posts'], posts[2::-1])
+        self.assertIsNone(response.context['next_before'])
+
+    def test_mentions_feed(self):
+        post = Post.objects.create(text='Привет, @reader!', author=self.author)
+        Post.objects.create(text='Привет всем', author=self.author)
+        url = reverse('posts:mentions')
+        self.assertRedirects(
+            self.client.get(url), f'{reverse("users:login")}?next={url}'
+        )
+        self.client.force_login(self.reader)
+        self.assertEqual(self.client.get(url).context['posts'], [post])
+
+    def test_backfill(self):
+        Post.objects.bulk_create(
+            Post(text=f'Старый пост #архив {i}', author=self.author)
+            for i in range(5)
+        )
+        self.assertFalse(PostTag.objects.exists())
+        call_command('backfill_tags', batch_size=2, stdout=StringIO())
+        tag = Tag.objects.get(name='архив')
+        self.assertEqual(tag.post_links.count(), 5)
+        self.assertIn('href=', Post.objects.first().text_html)
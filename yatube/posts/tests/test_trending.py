@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post, TrendingScore
+from ..trending import bump, rebase, trim
+
+User = get_user_model()
+
+
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='trend')
+        cls.posts = [
+            Post.objects.create(text=f'Пост {i}', author=cls.user)
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_recent_activity_outranks_old(self):
+        """Свежий комментарий весит больше, чем давние просмотры."""
+        old, fresh, _ = self.posts
+        now = settings.TRENDING_EPOCH + timedelta(days=30)
+        for _ in range(5):
+            bump(old.pk, 1, now - 3 * settings.TRENDING_HALF_LIFE)
+        bump(fresh.pk, 1, now)
+        self.assertEqual(
+            list(TrendingScore.objects.values_list('post_id', flat=True)),
+            [fresh.pk, old.pk],
+        )
+
+    def test_comment_and_view_update_score(self):
+        post = self.posts[0]
+        self.client.get(reverse('posts:post_detail', args=(post.pk,)))
+        viewed = TrendingScore.objects.get(post=post).score
+        self.client.post(
+            reverse('posts:add_comment', args=(post.pk,)),
+            {'text': 'Комментарий'},
+        )
+        self.assertGreater(TrendingScore.objects.get(post=post).score,
+                           viewed)
+        response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(list(response.context['page_obj']), [post])
+
+    def test_rebase_keeps_order_and_overflow_is_ignored(self):
+        """Перенос эпохи сохраняет порядок; без переноса bump не падает."""
+        epoch, half_life = settings.TRENDING_EPOCH, settings.TRENDING_HALF_LIFE
+        with self.assertLogs('posts.trending', 'ERROR'):
+            bump(self.posts[0].pk, 1, epoch + 2000 * half_life)
+        self.assertFalse(TrendingScore.objects.exists())
+        bump(self.posts[0].pk, 1, epoch + 500 * half_life)
+        bump(self.posts[1].pk, 1, epoch + 499 * half_life)
+        rebase(epoch + 505 * half_life)
+        bump(self.posts[2].pk, 1, epoch + 505 * half_life)
+        scores = dict(TrendingScore.objects.values_list('post_id', 'score'))
+        self.assertEqual(scores[self.posts[2].pk], 1)
+        self.assertAlmostEqual(scores[self.posts[0].pk], 2 ** -5)
+        self.assertAlmostEqual(scores[self.posts[1].pk], 2 ** -6)
+
+    @override_settings(TRENDING_SIZE=2)
+    def test_trim_keeps_top(self):
+        """В рейтинге остаются только TRENDING_SIZE лучших постов."""
+        for weight, post in enumerate(self.posts, start=1):
+            bump(post.pk, weight)
+        trim()
+        self.assertEqual(
+            set(TrendingScore.objects.values_list('post_id', flat=True)),
+            {self.posts[1].pk, self.posts[2].pk},
+        )
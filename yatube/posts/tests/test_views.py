@@ -123,6 +123,20 @@ class PostTests(TestCase):
         new_posts = response_new.content
         self.assertNotEqual(old_posts, new_posts)
 
+    def test_post_card_cache(self):
+        """Карточка поста берётся из кеша, пока пост не изменён."""
+        cache.clear()
+        url = reverse('posts:group_posts', kwargs={'slug': 'test_slug'})
+        self.guest_client.get(url)
+        Post.objects.filter(pk=self.post.pk).update(text='Без сохранения')
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Текст поста')
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный текст'
+        post.save()
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Исправленный текст')
+
 
 class PaginatorViewsTest(TestCase):
     @classmethod
@@ -268,3 +282,44 @@ class CommentViewsTest(TestCase):
                 text=form_data['text']
             ).exists()
         )
+
+
+class GroupDirectoryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='directory')
+        cls.quiet = Group.objects.create(
+            title='Тихая группа', slug='quiet', description='Описание')
+        cls.busy = Group.objects.create(
+            title='Активная группа', slug='busy', description='Описание')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_stats_follow_posts(self):
+        """Сводка группы обновляется при создании, переносе и удалении."""
+        first = Post.objects.create(
+            text='Первый', author=self.user, group=self.busy)
+        second = Post.objects.create(
+            text='Второй', author=self.user, group=self.busy)
+        self.busy.stats.refresh_from_db()
+        self.assertEqual(self.busy.stats.posts_count, 2)
+        self.assertEqual(self.busy.stats.latest_post, second)
+        second.group = self.quiet
+        second.save()
+        self.busy.stats.refresh_from_db()
+        self.assertEqual(self.busy.stats.posts_count, 1)
+        self.assertEqual(self.busy.stats.latest_post, first)
+        first.delete()
+        self.busy.stats.refresh_from_db()
+        self.assertEqual(self.busy.stats.posts_count, 0)
+        self.assertIsNone(self.busy.stats.last_activity)
+
+    def test_directory_lists_active_groups_first(self):
+        Post.objects.create(
+            text='Свежий пост', author=self.user, group=self.busy)
+        response = self.client.get(reverse('posts:groups'))
+        self.assertEqual(
+            list(response.context['page_obj']), [self.busy, self.quiet])
+        self.assertContains(response, 'Свежий пост')
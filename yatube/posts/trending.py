@@ -0,0 +1,91 @@
+"""Рейтинг популярных постов с прямым затуханием (forward decay).
+
+Обычный затухающий рейтинг («очки, делённые на возраст») приходится
+пересчитывать для всех постов при каждом показе. Здесь затухание
+перевёрнуто: вклад события растёт со временем как
+2 ** ((t - TRENDING_EPOCH) / TRENDING_HALF_LIFE). Отношение вкладов двух
+событий ровно такое же, как при затухании, поэтому сумма вкладов
+упорядочивает посты как затухающий рейтинг, а обновляется одним
+UPDATE score = score + w без пересчёта старых очков.
+
+Вклады растут экспоненциально, и float переполнится примерно через
+1000 периодов полураспада после эпохи. Поэтому эпоха хранится в базе
+(TrendingEpoch, до первого переноса — TRENDING_EPOCH) и периодически
+переносится вперёд командой rebase_trending: при переносе на Δ все очки
+умножаются на 2 ** (-Δ / HALF_LIFE), и порядок постов не меняется. Если
+перенос пропустили и вклад переполнился, bump() только пишет ошибку в
+журнал: ломается рейтинг, а не страницы, которые его обновляют.
+
+Таблица хранит только TRENDING_SIZE лучших постов: время от времени
+(в среднем раз в TRENDING_TRIM_EVERY обновлений) всё, что ниже K-го
+места, удаляется.
+"""
+import logging
+import random
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import TrendingEpoch, TrendingScore
+
+logger = logging.getLogger(__name__)
+
+
+def current_epoch():
+    epoch = TrendingEpoch.objects.values_list('epoch', flat=True).first()
+    return epoch or settings.TRENDING_EPOCH
+
+
+def event_weight(weight, now=None, epoch=None):
+    elapsed = (now or timezone.now()) - (epoch or current_epoch())
+    return weight * 2 ** (elapsed / settings.TRENDING_HALF_LIFE)
+
+
+def bump(post_id, weight, now=None):
+    """Добавляет посту событие веса weight (комментарий, просмотр)."""
+    try:
+        value = event_weight(weight, now)
+    except OverflowError:
+        logger.error('Рейтинг переполнен: запустите rebase_trending')
+        return
+    scores = TrendingScore.objects.filter(post_id=post_id)
+    if not scores.update(score=F('score') + value):
+        try:
+            with transaction.atomic():
+                TrendingScore.objects.create(post_id=post_id, score=value)
+        except IntegrityError:
+            # Запись одновременно создал другой запрос.
+            scores.update(score=F('score') + value)
+    if random.randrange(settings.TRENDING_TRIM_EVERY) == 0:
+        trim()
+
+
+def rebase(now=None):
+    """Переносит эпоху рейтинга на now, пересчитывая очки в новую шкалу.
+
+    Событие, учтённое одновременно с переносом, может попасть в старую
+    шкалу; при переносе раз в несколько периодов полураспада это
+    незаметно.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        epoch = current_epoch()
+        if now <= epoch:
+            return epoch
+        # Множитель может уйти в ноль, но не переполниться.
+        factor = 2 ** -((now - epoch) / settings.TRENDING_HALF_LIFE)
+        TrendingScore.objects.update(score=F('score') * factor)
+        TrendingEpoch.objects.all().delete()
+        TrendingEpoch.objects.create(epoch=now)
+    return now
+
+
+def trim(size=None):
+    """Оставляет в рейтинге только size лучших постов."""
+    size = size or settings.TRENDING_SIZE
+    threshold = TrendingScore.objects.values_list(
+        'score', flat=True)[size - 1:size]
+    if threshold:
+        TrendingScore.objects.filter(score__lt=threshold[0]).delete()
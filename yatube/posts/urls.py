@@ -6,9 +6,21 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('trending/', views.trending, name='trending'),
+    path('groups/', views.groups, name='groups'),
+    path('new/', views.new_posts, name='new_posts'),
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
+    path('tags/<str:name>/', views.tag_posts, name='tag_posts'),
+    path('mentions/', views.mentions, name='mentions'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/like/', views.post_like, name='post_like'
+    ),
+    path(
+        'posts/<int:post_id>/unlike/', views.post_unlike, name='post_unlike'
+    ),
+    path('likes/', views.likes_state, name='likes_state'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<post_id>/edit/', views.post_edit, name='post_edit'),
     path(
@@ -1,9 +1,17 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.core.paginator import Paginator
-from .models import Post, Group, Follow
+from .models import Post, Group, Follow, PostCounter, Tag
 from django.contrib.auth import get_user_model
 from .forms import PostForm, CommentForm
+from .paginator import FeedPaginator, keyset_page
+from . import trending as trending_scores
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
+from django.db.models import F
+from django.http import Http404, JsonResponse
+from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.decorators.http import require_POST, require_safe
+from . import events
+from . import likes
 
 
 Clip = 10
@@ -11,8 +19,8 @@ User = get_user_model()
 
 
 def index(request):
-    post_list = Post.objects.select_related('author', 'group')
-    paginator = Paginator(post_list, Clip)
+    post_list = Post.objects.feed()
+    paginator = FeedPaginator(post_list, Clip, scope='all')
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
@@ -21,10 +29,22 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+def groups(request):
+    group_list = Group.objects.select_related(
+        'stats', 'stats__latest_post', 'stats__latest_post__author'
+    ).defer(
+        'stats__latest_post__text', 'stats__latest_post__text_html'
+    ).order_by(F('stats__last_activity').desc(nulls_last=True), 'title')
+    paginator = FeedPaginator(group_list, Clip)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    return render(request, 'posts/groups.html', {'page_obj': page_obj})
+
+
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all().select_related('author')
-    paginator = Paginator(post_list, Clip)
+    post_list = group.posts.feed()
+    paginator = FeedPaginator(post_list, Clip, scope=f'group:{group.pk}')
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
@@ -34,8 +54,37 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    posts, next_before = keyset_page(
+        Post.objects.feed().filter(tag_links__tag=tag),
+        request.GET.get('before', ''), Clip,
+    )
+    context = {
+        'tag': tag,
+        'posts': posts,
+        'next_before': next_before,
+    }
+    return render(request, 'posts/tag_posts.html', context)
+
+
+@login_required
+def mentions(request):
+    posts, next_before = keyset_page(
+        Post.objects.feed().filter(mention_links__user=request.user),
+        request.GET.get('before', ''), Clip,
+    )
+    context = {
+        'posts': posts,
+        'next_before': next_before,
+    }
+    return render(request, 'posts/mentions.html', context)
+
+
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
+    user = get_object_or_404(
+        User, username=username, deletion__isnull=True
+    )
     follow_count = user.follower.all().count()
     followers_count = user.following.all().count()
     following = request.user.is_authenticated and \
@@ -43,11 +92,11 @@ def profile(request, username):
             user=request.user,
             author=user
         ).exists()
-    author_posts = user.posts.select_related('group', 'author')
-    count = author_posts.count()
-    paginator = Paginator(author_posts, Clip)
+    author_posts = user.posts.feed()
+    paginator = FeedPaginator(author_posts, Clip, scope=f'author:{user.pk}')
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    count = paginator.count
     context = {
         'author': user,
         'page_obj': page_obj,
@@ -59,18 +108,99 @@ def profile(request, username):
     return render(request, 'posts/profile.html', context)
 
 
+def trending(request):
+    post_list = Post.objects.feed().filter(
+        trending__isnull=False
+    ).order_by('-trending__score')
+    paginator = FeedPaginator(post_list, Clip)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    return render(request, 'posts/trending.html', {'page_obj': page_obj})
+
+
+@require_safe
+def new_posts(request):
+    """Число и id постов ленты новее ?since=<id>, без рендеринга.
+
+    Без since отвечает только id новейшего поста — с него клиент
+    начинает опрос. Ответ «новых нет» берётся из кеша, без запросов.
+    """
+    scopes = events.scopes_for(request.GET, request.user)
+    if not scopes:
+        raise Http404('Нет такой ленты')
+    newest = events.feed_head(scopes)
+    since = request.GET.get('since', '')
+    ids = []
+    if since.isdigit() and int(since) < newest:
+        ids = events.newer_posts(
+            scopes, int(since), settings.NEW_POSTS_LIMIT + 1
+        )
+    return JsonResponse({
+        'count': min(len(ids), settings.NEW_POSTS_LIMIT),
+        'more': len(ids) > settings.NEW_POSTS_LIMIT,
+        'ids': ids[:settings.NEW_POSTS_LIMIT],
+        'newest': max(ids[:1] + [newest]),
+    })
+
+
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.visible(), id=post_id)
+    trending_scores.bump(post.pk, settings.TRENDING_VIEW_WEIGHT)
     form = CommentForm()
-    comments = post.comments.select_related('post', 'author')
+    comments = post.comments.filter(
+        author__deletion__isnull=True
+    ).select_related('post', 'author')
     context = {
         'post': post,
         'form': form,
-        'comments': comments
+        'comments': comments,
+        'author_posts_count': PostCounter.objects.total(
+            [f'author:{post.author_id}']
+        ),
+        'likes': likes.state(request.user, [post.pk])[post.pk],
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@require_safe
+@ensure_csrf_cookie
+def likes_state(request):
+    """Лайки постов ?ids=1,2,3 для страницы ленты: два запроса на всё.
+
+    Карточки в лентах кешируются общими для всех, поэтому лайки в них
+    подставляет скрипт по этому ответу.
+    """
+    ids = [
+        int(pk) for pk in request.GET.get('ids', '').split(',')
+        if pk.isdigit()
+    ][:settings.LIKES_STATE_LIMIT]
+    return JsonResponse({
+        'authenticated': request.user.is_authenticated,
+        'posts': likes.state(request.user, ids),
+    })
+
+
+def _like_response(request, post_id):
+    if request.is_ajax():
+        return JsonResponse(likes.state(request.user, [post_id])[post_id])
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+@require_POST
+def post_like(request, post_id):
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
+    likes.like(request.user, post.pk)
+    return _like_response(request, post.pk)
+
+
+@login_required
+@require_POST
+def post_unlike(request, post_id):
+    likes.unlike(request.user, post_id)
+    return _like_response(request, post_id)
+
+
 @login_required
 def post_create(request):
     form = PostForm(
@@ -92,7 +222,7 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
     if request.user != post.author:
         return redirect('posts:post_detail', post_id=post_id)
     form = PostForm(
@@ -113,20 +243,28 @@ def post_edit(request, post_id):
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
         comment.save()
+        trending_scores.bump(post.pk, settings.TRENDING_COMMENT_WEIGHT)
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(posts, Clip)
+    posts = Post.objects.feed().filter(
+        author__following__user=request.user
+    )
+    authors = Follow.objects.filter(user=request.user).values_list(
+        'author_id', flat=True
+    )
+    paginator = FeedPaginator(
+        posts, Clip, scope=[f'author:{pk}' for pk in authors]
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return render(
@@ -138,7 +276,9 @@ def follow_index(request):
 
 @login_required
 def profile_follow(request, username):
-    user = get_object_or_404(User, username=username)
+    user = get_object_or_404(
+        User, username=username, deletion__isnull=True
+    )
     if user == request.user:
         return redirect(
             'posts:profile',
@@ -0,0 +1,106 @@
+"""Прогрев кеша после деплоя или перезапуска.
+
+Рендерит первые страницы главной и самых крупных групп так же, как это
+сделал бы первый посетитель: заполняются фрагментный кеш ленты, кеш
+карточек постов и ключи миниатюр sorl-thumbnail. Отдельно рендерятся
+карточки популярных постов.
+
+LocMemCache у каждого процесса свой, поэтому прогревать его надо в самом
+воркере — для этого есть start_in_background() (см. yatube/wsgi.py).
+Команда warm_cache полезна с общим кешем (memcached, Redis) и для
+миниатюр: их файлы и записи хранилища ключей переживают перезапуск.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from .cards import render_cards
+from .models import GroupStats, Post
+
+logger = logging.getLogger(__name__)
+
+
+def warmup_urls(pages, groups):
+    urls = []
+    for page in range(1, pages + 1):
+        urls.append(reverse('posts:index') + '?' + urlencode({'page': page}))
+    slugs = GroupStats.objects.filter(posts_count__gt=0).order_by(
+        '-posts_count').values_list('group__slug', flat=True)[:groups]
+    for slug in slugs:
+        urls.append(reverse('posts:group_posts', args=(slug,)))
+    return urls
+
+
+def render_url(url):
+    """Рендерит страницу анонимным запросом, минуя middleware."""
+    request = RequestFactory().get(url)
+    request.user = AnonymousUser()
+    request.resolver_match = match = resolve(request.path_info)
+    started = time.perf_counter()
+    response = match.func(request, *match.args, **match.kwargs)
+    return response.status_code, time.perf_counter() - started
+
+
+def warm_cards(count):
+    posts = Post.objects.feed().filter(
+        trending__isnull=False
+    ).order_by('-trending__score')[:count]
+    return len(render_cards(posts))
+
+
+def _in_thread(func, *args):
+    try:
+        return func(*args)
+    finally:
+        # У каждого потока своё соединение с БД — закрываем его сразу.
+        connection.close()
+
+
+def warm(pages=None, groups=None, cards=None, concurrency=None):
+    """Прогревает кеш; возвращает список (url, статус, секунды).
+
+    concurrency ограничивает число одновременных рендеров, чтобы прогрев
+    не занял всю базу; при 1 всё выполняется в текущем потоке.
+    """
+    pages = settings.CACHE_WARMUP_PAGES if pages is None else pages
+    groups = settings.CACHE_WARMUP_GROUPS if groups is None else groups
+    cards = settings.CACHE_WARMUP_CARDS if cards is None else cards
+    concurrency = concurrency or settings.CACHE_WARMUP_CONCURRENCY
+    urls = warmup_urls(pages, groups)
+    if concurrency == 1:
+        results = [render_url(url) for url in urls]
+        warm_cards(cards)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(_in_thread, render_url, url)
+                       for url in urls]
+            futures.append(executor.submit(_in_thread, warm_cards, cards))
+            results = [future.result() for future in futures[:-1]]
+            futures[-1].result()
+    return [(url, *result) for url, result in zip(urls, results)]
+
+
+def _warm_quietly():
+    try:
+        warm()
+    except Exception:
+        logger.exception('Не удалось прогреть кеш')
+    finally:
+        connection.close()
+
+
+def start_in_background():
+    """Прогревает кеш процесса в фоне, не задерживая его запуск."""
+    thread = threading.Thread(
+        target=_warm_quietly, name='cache-warmup', daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,71 @@
+// Лайки в карточках ленты. Карточки кешируются общими для всех, поэтому
+// число лайков и отметку «мне нравится» подставляем здесь: состояние всей
+// страницы — один запрос к /likes/.
+(function () {
+  var script = document.currentScript;
+
+  function csrfToken() {
+    var match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+    return match ? match[1] : '';
+  }
+
+  function render(node, state, authenticated) {
+    var button = document.createElement('button');
+    button.type = 'button';
+    button.className = 'btn btn-sm mb-2 ' +
+      (state.liked ? 'btn-danger' : 'btn-outline-danger');
+    button.textContent = '♥ ' + state.likes;
+    button.addEventListener('click', function () {
+      if (!authenticated) {
+        window.location = script.dataset.login + '?next=' +
+          encodeURIComponent(window.location.pathname);
+        return;
+      }
+      var url = state.liked ? node.dataset.unlike : node.dataset.like;
+      fetch(url, {
+        method: 'POST',
+        credentials: 'same-origin',
+        headers: {
+          'X-CSRFToken': csrfToken(),
+          'X-Requested-With': 'XMLHttpRequest'
+        }
+      })
+        .then(function (response) {
+          return response.ok ? response.json() : null;
+        })
+        .then(function (data) {
+          if (data) {
+            render(node, data, authenticated);
+          }
+        });
+    });
+    node.replaceChildren(button);
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    var nodes = document.querySelectorAll('[data-post-likes]');
+    if (!nodes.length) {
+      return;
+    }
+    var ids = Array.prototype.map.call(nodes, function (node) {
+      return node.dataset.postLikes;
+    });
+    fetch(script.dataset.state + '?ids=' + ids.join(','), {
+      credentials: 'same-origin'
+    })
+      .then(function (response) {
+        return response.ok ? response.json() : null;
+      })
+      .then(function (data) {
+        if (!data) {
+          return;
+        }
+        nodes.forEach(function (node) {
+          var state = data.posts[node.dataset.postLikes];
+          if (state) {
+            render(node, state, data.authenticated);
+          }
+        });
+      });
+  });
+})();
@@ -0,0 +1,56 @@
+// Показывает над лентой число новых постов. Новые посты приходят из
+// потока /events/, а если он недоступен — опросом /new/ раз в полминуты.
+(function () {
+  var banner = document.getElementById('new-posts');
+  if (!banner) {
+    return;
+  }
+  var POLL_INTERVAL = 30000;
+  var total = 0;
+  // Сколько новых постов насчитал поток до перехода на опрос.
+  var base = 0;
+
+  function show(count) {
+    total = count;
+    banner.querySelector('span').textContent = total;
+    banner.hidden = !total;
+  }
+
+  function poll(since) {
+    var url = banner.dataset.poll;
+    if (since !== undefined) {
+      url += '&since=' + since;
+    }
+    fetch(url, {credentials: 'same-origin'})
+      .then(function (response) {
+        return response.ok ? response.json() : null;
+      })
+      .then(function (data) {
+        if (!data) {
+          return;
+        }
+        if (since === undefined) {
+          since = data.newest;
+          base = total;
+        } else {
+          show(base + data.count);
+        }
+        setTimeout(poll, POLL_INTERVAL, since);
+      });
+  }
+
+  if (!banner.dataset.events || !window.EventSource) {
+    poll();
+    return;
+  }
+  var source = new EventSource(banner.dataset.events);
+  source.addEventListener('posts', function (event) {
+    show(total + JSON.parse(event.data).new);
+  });
+  source.onerror = function () {
+    // Закрытый поток не переподключается: переходим на опрос.
+    if (source.readyState === EventSource.CLOSED) {
+      poll();
+    }
+  };
+})();
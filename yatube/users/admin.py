@@ -0,0 +1,16 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+
+from posts.admin import SoftDeleteMixin
+from posts.purge import soft_delete_user
+
+User = get_user_model()
+
+
+class SoftDeleteUserAdmin(SoftDeleteMixin, UserAdmin):
+    soft_delete = staticmethod(soft_delete_user)
+
+
+admin.site.unregister(User)
+admin.site.register(User, SoftDeleteUserAdmin)
@@ -1,5 +1,8 @@
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import get_user_model
+from django.forms import ModelForm
+
+from core import hashing
 
 
 User = get_user_model()
@@ -9,3 +12,11 @@ class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ('first_name', 'last_name', 'username', 'email')
+
+    def save(self, commit=True):
+        # Хеш пароля считается в пуле процессов, а не в потоке запроса.
+        user = ModelForm.save(self, commit=False)
+        user.password = hashing.make_password(self.cleaned_data['password1'])
+        if commit:
+            user.save()
+        return user
@@ -1,5 +1,5 @@
 from django.contrib.auth.views import (
-    LoginView, LogoutView, PasswordResetView,
+    LogoutView, PasswordResetView,
     PasswordResetDoneView, PasswordChangeView,
     PasswordResetConfirmView, PasswordChangeDoneView,
     PasswordResetCompleteView)
@@ -13,8 +13,7 @@ urlpatterns = [
     path('signup/', views.SignUp.as_view(), name='signup'),
     path('logout/', LogoutView.as_view(template_name='users/logged_out.html'),
          name='logout'),
-    path('login/', LoginView.as_view(template_name='users/login.html'),
-         name='login'),
+    path('login/', views.Login.as_view(), name='login'),
     path('password_reset/', PasswordResetView.as_view(
         template_name='users/password_reset_form.html'),
         name='password_reset_form'),
@@ -1,3 +1,4 @@
+from django.contrib.auth.views import LoginView
 from django.views.generic import CreateView
 
 from django.views.generic.base import TemplateView
@@ -7,6 +8,10 @@ from django.urls import reverse_lazy
 from .forms import CreationForm
 
 
+class Login(LoginView):
+    template_name = 'users/login.html'
+
+
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
@@ -0,0 +1,42 @@
+"""
+ASGI config for Yatube project.
+
+Обычные запросы обслуживает WSGI-приложение Django в пуле потоков
+(core/asgi.py), а EVENTS_URL — поток новых постов (core/events.py) в
+цикле событий того же процесса. Запуск: uvicorn yatube.asgi:application
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import ASGIHandler
+from core.events import EventStream
+from core.templating import warm_templates
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+# get_wsgi_application() загружает приложения, после неё можно
+# импортировать модули с моделями.
+wsgi_application = get_wsgi_application()
+
+from posts.events import feed_scopes  # noqa: E402
+
+# Поток есть только здесь: страницы под WSGI не должны на него ссылаться.
+settings.EVENTS_ENABLED = True
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASGI_THREADS, thread_name_prefix='wsgi'
+)
+application = ASGIHandler(wsgi_application, executor, routes=(
+    (settings.EVENTS_URL, EventStream(feed_scopes, executor)),
+))
+
+# Шаблоны прогреваются только в воркере, а не в каждой команде manage.py.
+warm_templates()
+
+if settings.CACHE_WARMUP_ON_STARTUP:
+    from posts.warmup import start_in_background
+
+    start_in_background()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+from datetime import datetime, timedelta, timezone
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -62,10 +63,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'core.middleware.HtmlMinifyMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.ratelimit.RateLimitMiddleware',
+    'core.middleware.HashingBusyMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -75,6 +80,11 @@ ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
+# Шаблоны из этих каталогов компилируются при старте воркера
+# (yatube/wsgi.py, yatube/asgi.py). Без DEBUG Django сам подключает
+# кеширующий загрузчик, так что прогретые шаблоны остаются в памяти.
+TEMPLATE_WARMUP_DIRS = [TEMPLATES_DIR]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -87,12 +97,40 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.events.events_url',
             ],
         },
     },
 ]
 
+# бэкенд кеширования
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+# Общий ли кеш для всех воркеров. LocMemCache у каждого процесса свой:
+# сброс записи в одном воркере не виден другим, поэтому всё, что
+# полагается на такой сброс, с ним выключено (проверки core.W001-W004).
+SHARED_CACHE = CACHES['default']['BACKEND'] != (
+    'django.core.cache.backends.locmem.LocMemCache'
+)
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
+# Под ASGI (yatube/asgi.py): потоки для Django-запросов, включён ли поток
+# новых постов (его включает сам yatube/asgi.py), его адрес, предел
+# соединений с ним, период пинга и пауза перед переподключением клиента
+# (в секундах)
+ASGI_THREADS = 32
+EVENTS_ENABLED = False
+EVENTS_URL = '/events/'
+EVENTS_MAX_CONNECTIONS = 10000
+EVENTS_HEARTBEAT = 25
+EVENTS_RETRY = 10
+# Опрос новых постов (posts.views.new_posts): сколько id отдавать и
+# сколько секунд хранить в кеше id новейшего поста ленты (0 — не кешировать)
+NEW_POSTS_LIMIT = 100
+FEED_HEAD_CACHE_TIMEOUT = 60 * 60 if SHARED_CACHE else 0
 
 
 # Database
@@ -144,16 +182,107 @@ USE_TZ = True
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+# Письма подписчикам (posts/notifications.py): адрес сайта для ссылок,
+# сколько постов перечислять в письме и размер пачки подписчиков
+SITE_URL = 'http://127.0.0.1:8000'
+DIGEST_MAX_POSTS = 10
+NOTIFICATION_BATCH_SIZE = 500
+# Пользователь запроса берётся из кеша (core/auth.py), сессии — из кеша
+# с записью в базу раз в SESSION_WRITE_BEHIND секунд (core/sessions.py).
+# Оба режима только с общим кешем, 0 — выключено
+AUTHENTICATION_BACKENDS = ['core.auth.CachedModelBackend']
+USER_CACHE_TIMEOUT = 60 * 5 if SHARED_CACHE else 0
+SESSION_ENGINE = 'core.sessions'
+SESSION_WRITE_BEHIND = 10 if SHARED_CACHE else 0
+
+# Хеширование паролей в пуле процессов (core/hashing.py): число процессов,
+# предел очереди и сколько секунд задание может ждать в ней
+PASSWORD_HASHING_WORKERS = 2
+PASSWORD_HASHING_QUEUE = 32
+PASSWORD_HASHING_MAX_WAIT = 5
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+# collectstatic минифицирует CSS/JS, добавляет хеш в имена файлов
+# и кладёт рядом сжатые копии .gz/.br
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Отдача медиа и статики: None — Django отдаёт файлы сам (через sendfile,
+# если его поддерживает WSGI-сервер), 'x-accel-redirect' — передаёт
+# отдачу nginx, 'x-sendfile' — Apache/lighttpd
+FILE_SERVING_OFFLOAD = None
+# internal-локации nginx для X-Accel-Redirect
+FILE_SERVING_ACCEL_PREFIXES = {
+    'media': '/protected/media/',
+    'static': '/protected/static/',
+}
 
-# бэкенд кеширования
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+# Ширины копий картинок для srcset и число первых карточек ленты,
+# картинки которых грузятся сразу, без loading="lazy"
+RESPONSIVE_IMAGE_WIDTHS = (320, 640, 960, 1280)
+RESPONSIVE_IMAGE_EAGER = 1
+
+# Сколько секунд хранится HTML карточки поста. Ключ карточки меняется при
+# любой её правке, так что срок нужен лишь для вытеснения старых версий.
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Популярные посты: вес комментария, просмотра и лайка, период полураспада
+# рейтинга, начало отсчёта времени и число постов в рейтинге
+TRENDING_COMMENT_WEIGHT = 3
+TRENDING_VIEW_WEIGHT = 1
+TRENDING_LIKE_WEIGHT = 2
+TRENDING_HALF_LIFE = timedelta(days=1)
+TRENDING_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+TRENDING_SIZE = 100
+TRENDING_TRIM_EVERY = 50
+
+# Прогрев кеша (posts/warmup.py): страницы главной, крупные группы,
+# карточки популярных постов и число одновременных рендеров.
+# CACHE_WARMUP_ON_STARTUP прогревает кеш каждого воркера при запуске.
+CACHE_WARMUP_PAGES = 3
+CACHE_WARMUP_GROUPS = 5
+CACHE_WARMUP_CARDS = 30
+CACHE_WARMUP_CONCURRENCY = 2
+CACHE_WARMUP_ON_STARTUP = False
+
+# Лимиты запросов на запись по имени URL (core/ratelimit.py): ведро на
+# пользователя и на IP; methods — какие методы считаются записью
+RATELIMITS = {
+    'posts:post_create': {'rates': {'user': '10/m', 'ip': '30/m'}},
+    'posts:post_edit': {'rates': {'user': '20/m', 'ip': '60/m'}},
+    'posts:add_comment': {'rates': {'user': '10/m', 'ip': '30/m'}},
+    'posts:profile_follow': {
+        'rates': {'user': '30/m', 'ip': '60/m'},
+        'methods': ('GET', 'POST'),
+    },
+    'posts:profile_unfollow': {
+        'rates': {'user': '30/m', 'ip': '60/m'},
+        'methods': ('GET', 'POST'),
+    },
+    'posts:post_like': {'rates': {'user': '60/m', 'ip': '120/m'}},
+    'posts:post_unlike': {'rates': {'user': '60/m', 'ip': '120/m'}},
 }
+
+# Лайки (posts/likes.py): на сколько частей разбит счётчик поста и
+# для скольких постов за раз отдаёт состояние view likes_state
+LIKE_COUNTER_SHARDS = 8
+LIKES_STATE_LIMIT = 100
+
+# Фоновые задания (core/jobs.py): выполнять ли их сразу в потоке
+# процесса, поставившего задание; иначе — командой run_jobs.
+# PURGE_BATCH_SIZE — сколько строк удаляет один шаг очистки;
+# выполненные задания старше JOBS_KEEP_DONE удаляет run_jobs
+JOBS_RUN_IN_THREAD = True
+JOBS_KEEP_DONE = timedelta(days=7)
+PURGE_BATCH_SIZE = 200
+# Больше стольких объектов страница подтверждения массового действия
+# в админке показывает только их число
+BULK_ACTION_LIST_LIMIT = 100
+
+# Ответы короче этого (в байтах) не сжимаются: выигрыш меньше накладных
+COMPRESSION_MIN_SIZE = 512
@@ -13,10 +13,13 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from core.views import job_progress, metrics, serve_media, serve_static
 
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.permission_denied'
@@ -27,13 +30,23 @@ urlpatterns = [
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('metrics/', metrics, name='metrics'),
+    path('jobs/<int:pk>/', job_progress, name='job_progress'),
     path('', include('posts.urls', namespace='posts')),
 ]
 
+# Медиа и статику отдаём сами, только если они живут на этом же сайте,
+# а не на отдельном домене или CDN.
+for prefix, view in (
+    (settings.MEDIA_URL, serve_media),
+    (settings.STATIC_URL, serve_static),
+):
+    if prefix.startswith('/') and not prefix.startswith('//'):
+        urlpatterns.insert(0, re_path(
+            r'^%s(?P<path>.*)$' % re.escape(prefix.lstrip('/')), view
+        ))
+
 if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
     import debug_toolbar
 
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from core.templating import warm_templates
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Yatube.settings')
 
 application = get_wsgi_application()
+
+# Шаблоны прогреваются только в воркере, а не в каждой команде manage.py.
+warm_templates()
+
+if settings.CACHE_WARMUP_ON_STARTUP:
+    from posts.warmup import start_in_background
+
+    start_in_background()